@@ -0,0 +1,139 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from model.board import Board
+
+
+SIZES = ((10, 8), (20, 16), (50, 40), (100, 80))
+DENSITIES = {  # Part of the tiles that are left on the board
+    "full": 1.0,
+    "half": 0.5,
+    "nearly_empty": 0.1,
+}
+SEED = 2021
+REPEATS = 15
+THRESHOLD = 0.10  # A case is a regression if it is 10% slower
+
+
+def prepare_board(width:int, height:int, density:float):
+    """Create the board with the fixed seed and play the first legal moves until only density of the tiles are left."""
+    board = Board(width, height, seed=SEED)
+    board.init_board()
+    tiles_to_keep = int(width * height * density)
+    while (width * height) - 2 * board.eliminated_tiles > tiles_to_keep and not board.is_finished():
+        position_1, position_2, path = next(board.iter_legal_moves())
+        board.play_movement(*position_1, *position_2)
+    return board
+
+
+def measure(function, repeats:int, setup = None):
+    """Return the times in seconds of calling function repeats times, setup is called before every call without being measured."""
+    times = []
+    for repeat in range(repeats):
+        if setup is not None:
+            setup()
+        initial_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - initial_time)
+    return times
+
+
+def benchmark_case(width:int, height:int, density_name:str, repeats:int):
+    """Return {operation: times} for a board of width x height with the density called density_name."""
+    results = {}
+    if density_name == "full":
+        board = Board(width, height, seed=SEED)
+        results["init_board"] = measure(board.init_board, repeats)
+
+    board = prepare_board(width, height, DENSITIES[density_name])
+    results["is_possible_play"] = measure(board._Board__is_possible_play, repeats)
+
+    def forget_ranking():
+        board._Board__ranked_pairs = None
+    results["get_advised_tile_pair"] = measure(board.get_advised_tile_pair, repeats, forget_ranking)
+
+    moves = []
+    def next_move():
+        moves.clear()
+        moves.extend(next(board.iter_legal_moves())[:2])
+    def play_next_move():
+        board.play_movement(*moves[0], *moves[1])
+    moves_to_play = min(repeats, (width * height) // 2 - board.eliminated_tiles - 1)  # The board is not finished
+    if moves_to_play > 0:
+        results["play_movement"] = measure(play_next_move, moves_to_play, next_move)
+
+    results["shuffle_tiles"] = measure(board._Board__shuffle_tiles, repeats)
+    return results
+
+
+def run(sizes, repeats:int):
+    cases = {}
+    for width, height in sizes:
+        for density_name in DENSITIES:
+            for operation, times in benchmark_case(width, height, density_name, repeats).items():
+                name = "%dx%d/%s/%s" % (width, height, density_name, operation)
+                cases[name] = {
+                    "median": statistics.median(times),
+                    "min": min(times),
+                    "repeats": len(times),
+                }
+                print("%-45s %12.1f us" % (name, cases[name]["median"] * 1000000))
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "cases": cases,
+    }
+
+
+def compare(old_results:dict, new_results:dict, threshold:float):
+    """Return the names of the cases whose best time is more than threshold slower in new_results.
+    The best time is compared because it is the one that changes less with the load of the machine."""
+    regressions = []
+    for name, new_case in sorted(new_results["cases"].items()):
+        old_case = old_results["cases"].get(name)
+        if old_case is None:
+            continue
+        change = new_case["min"] / old_case["min"] - 1 if old_case["min"] > 0 else 0
+        flag = "REGRESSION" if change > threshold else ""
+        print("%-45s %12.1f us %12.1f us %+8.1f%% %s" % (name, old_case["min"] * 1000000,
+                                                       new_case["min"] * 1000000, change * 100, flag))
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(arguments:list):
+    parser = argparse.ArgumentParser(description="Measure the board engine and compare the results.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write the results as JSON.")
+    run_parser.add_argument("--output", default="benchmark_results.json")
+    run_parser.add_argument("--repeats", type=int, default=REPEATS)
+    run_parser.add_argument("--max-width", type=int, default=SIZES[-1][0], help="Skip the bigger boards.")
+    compare_parser = commands.add_parser("compare", help="Flag the cases that got slower between two results.")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    arguments = parser.parse_args(arguments)
+
+    if arguments.command == "run":
+        sizes = [size for size in SIZES if size[0] <= arguments.max_width]
+        results = run(sizes, arguments.repeats)
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        return 0
+
+    with open(arguments.old) as file:
+        old_results = json.load(file)
+    with open(arguments.new) as file:
+        new_results = json.load(file)
+    regressions = compare(old_results, new_results, arguments.threshold)
+    print("%d regressions" % len(regressions))
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,19 +1,20 @@
-import copy
-from random import shuffle
+import time
+from array import array
+from random import Random
+from model.connectivity import Connectivity
+from model.board_solver import BoardSolver
+from model.path import Path
+from model.stats import Stats
 
 
 class Tile:
-    def __init__(self, id):
-        self.id = id  # Id for the tile
-        #self.image = image_path  # image of the tile
+    """There is only one Tile for every id, and it is shared by all the tiles of the board
+    with that id."""
 
-        self.is_eliminated = False  # if it was eliminated from the board
-        self.is_clicked = False  # if the tile was clicked
+    __slots__ = ("id",)
 
-        self.board_position_i = -1  # row of the board
-        self.board_position_j = -1  # column of board
-        self.window_position_x = -1  # position x on the window
-        self.window_position_y = -1  # position y on the window
+    def __init__(self, id):
+        self.id = id  # Id for the tile
 
     def __str__(self):
         return str(self.id)
@@ -23,105 +24,103 @@ class Tile:
             return False
         return self.id == other.id
 
-    def get_board_position(self):
-        return (self.board_position_i, self.board_position_j)
-
-    def get_board_pos_i(self):
-        return self.board_position_i
-
-    def get_board_pos_j(self):
-        return self.board_position_j
-
-
-    def set_board_position(self, i_j: tuple):
-        self.board_position_i = i_j[0]
-        self.board_position_j = i_j[1]
-
-    def get_window_position(self):
-        return (self.window_position_x, self.window_position_y)
-
-    def get_window_pos_x(self):
-        return self.window_position_x
-
-    def get_window_pos_y(self):
-        return self.window_position_y
-
-    def set_window_position(self, x_y: tuple):
-        self.window_position_x = x_y[0]
-        self.window_position_y = x_y[1]
-
-    def has_board_pos(self):
-        return self.board_position_i != -1 and self.board_position_j != -1
-
-    def has_window_pos(self):
-        return self.window_position_x != -1 and self.window_position_y != -1
+    def __hash__(self):
+        return hash(self.id)
 
 
 class Board:
 
-    UP = "u"
-    DOWN = "d"
-    RIGHT = "r"
-    LEFT = "l"
-    # ----------------------------------------------------
-    #These lines will be set in a tile where path turns.
-    TURN_FROM_LEFT_TO_DOWN = "q"
-    # _
-    #  |
-    TURN_FROM_RIGHT_TO_DOWN = "e"
-    #  _
-    # |
-    TURN_FROM_RIGHT_TO_UP = "x"
-    # |_
-    TURN_FROM_LEFT_TO_UP = "z"
-    # _|
-    #------------------------------------------------------
-
-    # ----------------------------------------
-    # This lines is for the first and last tile of a path, where the line is the half of its size.
-    UP_HALF = "v"
-    DOWN_HALF = "b"
-    LEFT_HALF = "n"
-    RIGHT_HALF = "m"
-    # ------------------------------------------------------
-
-    #
-
     ADVISED_TILE_ERROR = [[-1, -1], [-1, -1]]
+    EMPTY = -1  # Value of the cells without tile, the border of the board is made of them
+    EMPTY_BYTE = 255  # Value of the cells without tile when the board is stored as bytes
     FINISH = "finish"
     PLAYING = "play"
 
-    def __init__(self, width:int, height:int):
+    # Ways to create the board ------------------------------------------
+    SHUFFLE_GENERATOR = "shuffle"  # Shuffle the tiles until there is a movement
+    CONSTRUCTIVE_GENERATOR = "constructive"  # Create a board that can be cleared
+    # --------------------------------------------------------------------
+
+    # Ways to get a movement when there is not one ---------------------
+    FULL_RESHUFFLE = "full"  # Shuffle all the tiles until there is a movement
+    TARGETED_RESHUFFLE = "targeted"  # Swap a tile to create a movement
+    # --------------------------------------------------------------------
+
+    DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    MAX_MISSED_WALKS = 32
+
+    # Records of the history --------------------------------------------
+    __MOVE_RECORD = 0  # kind, i1, j1, i2, j2, id, quantity of pairs, pairs that became playable (i1, j1, i2, j2)
+    __PERMUTATION_RECORD = 1  # kind, quantity of tiles, index in the tiles before for every tile after
+    __SWAP_RECORD = 2  # kind, i1, j1, i2, j2
+    # --------------------------------------------------------------------
+
+    def __init__(self, width:int, height:int, generator:str = SHUFFLE_GENERATOR, seed = None,
+                 reshuffle:str = FULL_RESHUFFLE, copies:int = 2):
+        """copies is the quantity of tiles of every id, it must be even so all of them can be joined."""
         if (width * height) % 2 != 0:
             raise Exception("There is not an even tile quantity.")
+        if copies < 2 or copies % 2 != 0 or (width * height) % copies != 0:
+            raise Exception("The tiles can not be separated in groups of that size.")
         self.width = width
         self.height = height
+        self.copies = copies
+        self.generator = generator
+        self.__random = Random(seed)  # All the random decisions of the board are taken with it
+        self.reshuffle = reshuffle
 
         self.tile_data = self.__set_tile_data()  # All tile will always be here, and will not be deleted from here
 
-        self.tile_board = None  # The board to play
+        self.tile_board = None  # The board to play, the ids of the tiles stored row by row in a flat array
+        self.__board_width = width + 2  # The board has a border of empty cells
+        self.__board_height = height + 2
+        self.__connectivity = Connectivity(width + 2, height + 2)  # To find the paths between tiles
 
-        self.tile_data_position = list(range(len(self.tile_data)))  # This is for the tile position in the board, it is helpful
-        # to find the if there is a possible movement in the game
+        self.tile_data_position = [[] for tile in self.tile_data]  # This is for the tile positions in the board indexed by the
+        # id of the tile, it is helpful to find the if there is a possible movement in the game
 
         self.eliminated_tiles = 0
 
+        # Index of legal movements ----------------------------------------
+        self.__tile_pairs = {}  # Every pair of tiles with the same id that is still in the board
+        self.__connectable_pairs = {}  # The pairs that can be played now, used as an ordered set
+        self.__last_rechecked_pairs = 0
+        self.__last_full_rescan_pairs = 0
+        self.__rechecked_pairs = 0
+        self.__full_rescan_pairs = 0
+        # ----------------------------------------------------------------
+
+        self.__ranked_pairs = None  # The hints sorted from the best one, until the board changes
+
+        # How the last board without movements was fixed
+        self.__recovery_attempts = 0
+        self.__recovery_microseconds = 0
+
+        self.__stats = None  # The measures of the operations, only when they are enabled
+
+        # History of the board to undo and redo the movements -------------
+        self.__history = array("h")  # The records of every step one after another
+        self.__steps = array("i")  # Where the records of every step start in the history
+        self.__done_steps = 0  # The steps after these ones were undone and can be redone
+        # --------------------------------------------------------------------
+
         self.game_state = self.PLAYING
 
 
     def get_tile_index(self, i:int, j:int):
-        tile = self.tile_board[i][j]
-        if tile is None:
-            return -1
-        return tile.id
+        return self.tile_board[i * self.__board_width + j]
+
+    def get_tile(self, i:int, j:int):
+        """Return the Tile in the position (i, j) or None if the cell is empty."""
+        id = self.tile_board[i * self.__board_width + j]
+        if id == self.EMPTY:
+            return None
+        return self.tile_data[id]
 
     def __set_tile_data(self):
         data_tiles = []
-        id = 0
-        for tile in range((self.height * self.width) // 2):
-                current_tile = Tile(id)
-                data_tiles.append(copy.deepcopy(current_tile))
-                id += 1
+        for id in range((self.height * self.width) // self.copies):
+            data_tiles.append(Tile(id))
         return data_tiles
 
     def is_finished(self):
@@ -136,42 +135,208 @@ class Board:
         self.game_state = self.PLAYING
 
     def init_board(self):
-        if ((int(self.width * self.height) / 2) > len(self.tile_data)):
+        if ((int(self.width * self.height) / self.copies) > len(self.tile_data)):
             raise Exception("There are not enough tiles to create the board.")
         self.__reset_eliminated_tiles()
-        self.tile_board = self.__separate_by_row()
+        self.__clear_history()
+        if self.generator == self.CONSTRUCTIVE_GENERATOR:
+            self.tile_board = self.__construct_board()
+        else:
+            self.tile_board = self.__separate_by_row()
+        self.__connectivity.rebuild(self.tile_board, self.EMPTY)
+        self.__rebuild_move_index()
+        self.__generate_playable_board()
+
+    def load_board(self, cells:bytes):
+        """Create the board from the ids of its tiles row by row, without the border, like the
+        records of a level pack. The ids must be the ones of a board of this size, and the cells
+        without tile are EMPTY_BYTE."""
+        if len(cells) != self.width * self.height:
+            raise Exception("The cells are not the ones of a board of this size.")
+        self.__reset_eliminated_tiles()
+        self.__clear_history()
+        for tile_positions in self.tile_data_position:
+            tile_positions.clear()
+        board = array("h", [self.EMPTY]) * (self.__board_width * self.__board_height)
+        current_index = 0
+        for i in range(1, self.height + 1):
+            for j in range(1, self.width + 1):
+                if cells[current_index] == self.EMPTY_BYTE:
+                    self.eliminated_tiles += 1
+                else:
+                    board[i * self.__board_width + j] = cells[current_index]
+                    self.tile_data_position[cells[current_index]].append((i, j))
+                current_index += 1
+        self.eliminated_tiles //= 2  # Every movement removes two tiles
+        self.tile_board = board
+        self.__connectivity.rebuild(self.tile_board, self.EMPTY)
+        self.__rebuild_move_index()
         self.__generate_playable_board()
 
+    def get_cells(self):
+        """Return the ids of the tiles row by row, without the border, as bytes (EMPTY_BYTE for
+        the cells without tile)."""
+        cells = bytearray(self.width * self.height)
+        current_index = 0
+        for i in range(1, self.height + 1):
+            for j in range(1, self.width + 1):
+                id = self.tile_board[i * self.__board_width + j]
+                cells[current_index] = id if id != self.EMPTY else self.EMPTY_BYTE
+                current_index += 1
+        return bytes(cells)
+
     def __separate_by_row(self):
         linear_board = []
-        for tile_index in range((self.width * self.height) // 2):
-            linear_board.append(copy.deepcopy(self.tile_data[tile_index]))
-            linear_board.append(copy.deepcopy(self.tile_data[tile_index]))
-        shuffle(linear_board)
-
-        board = [self.__row_of_none(self.width)]
+        for tile_index in range((self.width * self.height) // self.copies):
+            for copy in range(self.copies):
+                linear_board.append(tile_index)
+        self.__random.shuffle(linear_board)
+
+        for tile_positions in self.tile_data_position:
+            tile_positions.clear()
+        board = array("h", [self.EMPTY]) * (self.__board_width * self.__board_height)
         current_index = 0
-        while current_index + self.width <= len(linear_board):
-            current_row = [None]
-            current_row += linear_board[current_index: current_index + self.width] + [None]
-            board.append(current_row)
-            current_index += self.width
-        board.append(self.__row_of_none(self.width))
+        for i in range(1, self.height + 1):
+            for j in range(1, self.width + 1):
+                board[i * self.__board_width + j] = linear_board[current_index]
+                self.tile_data_position[linear_board[current_index]].append((i, j))
+                current_index += 1
         return board
 
-    def __row_of_none(self, width: int):
-        row = list(range(width + 2))
-        for i in range(len(row)):
-            row[i] = None
-        return row
+    def __construct_board(self):
+        """
+        Create a board that can be cleared without shuffling it.
+        If two cells can be joined only depends on which cells are empty, so a full board is
+        emptied playing random pairs of cells that can be joined, and then the tiles of every
+        pair get the same id (copies / 2 pairs share every id). Playing those pairs in the same
+        order clears the board.
+        The walks start from the inner cells when there are, and end in the edge of the board
+        when they can: two tiles of the edge can be joined along the border of the board, so if
+        the edge was emptied with pairs of its own tiles the board would start with many movements.
+        """
+        width = self.__board_width
+        board = array("h", [self.EMPTY]) * (width * self.__board_height)
+        # Cells with an empty neighbour, only from them a path can start: the inner ones and the ones of the edge
+        exposed_cells = ([], [])
+        exposed_index = {}
+        for i in range(1, self.height + 1):
+            for j in range(1, self.width + 1):
+                board[i * width + j] = 0
+                if self.__is_edge_cell(i, j):
+                    exposed_index[(i, j)] = len(exposed_cells[1])
+                    exposed_cells[1].append((i, j))
+
+        pairs = []
+        missed_walks = 0
+        while len(pairs) < (self.width * self.height) // 2:
+            cells = exposed_cells[0] if len(exposed_cells[0]) > 0 else exposed_cells[1]
+            tile = cells[self.__random.randrange(len(cells))]
+            partner = self.__random_partner(board, tile)
+            if partner is None:
+                missed_walks += 1
+                if missed_walks < self.MAX_MISSED_WALKS:
+                    continue
+                tile, partner = self.__first_joinable_pair(board)
+            missed_walks = 0
+            pairs.append((tile, partner))
+            for i, j in (tile, partner):
+                board[i * width + j] = self.EMPTY
+                if (i, j) in exposed_index:
+                    # Removing in O(1), the last cell takes the place of the removed one
+                    cells = exposed_cells[self.__is_edge_cell(i, j)]
+                    index = exposed_index.pop((i, j))
+                    last_cell = cells.pop()
+                    if last_cell != (i, j):
+                        cells[index] = last_cell
+                        exposed_index[last_cell] = index
+            for i, j in (tile, partner):
+                for di, dj in self.DIRECTIONS:
+                    neighbour = (i + di, j + dj)
+                    if board[neighbour[0] * width + neighbour[1]] != self.EMPTY and neighbour not in exposed_index:
+                        cells = exposed_cells[self.__is_edge_cell(*neighbour)]
+                        exposed_index[neighbour] = len(cells)
+                        cells.append(neighbour)
+
+        for tile_positions in self.tile_data_position:
+            tile_positions.clear()
+        tile_id = [id for id in range(len(self.tile_data)) for pair in range(self.copies // 2)]
+        self.__random.shuffle(tile_id)
+        for index in range(len(pairs)):
+            for i, j in pairs[index]:
+                board[i * width + j] = tile_id[index]
+                self.tile_data_position[tile_id[index]].append((i, j))
+        return board
+
+    def __random_partner(self, board:array, tile:tuple):
+        """
+        Walk from tile along empty cells, turning at most two times in random cells, and return
+        one of the tiles that stopped the walk, or None if the walk did not find a tile.
+        The walk starts towards an empty neighbour. The tiles next to tile are only returned if
+        there is not other one, or most of the pairs would be neighbours, and then the tiles of
+        the edge of the board are preferred (see __construct_board).
+        """
+        width = self.__board_width
+        i, j = tile
+        directions = [(di, dj) for di, dj in self.DIRECTIONS if 0 <= i + di < self.__board_height
+                      and 0 <= j + dj < width and board[(i + di) * width + j + dj] == self.EMPTY]
+        if len(directions) == 0:
+            return None
+        di, dj = directions[self.__random.randrange(len(directions))]
+        found_tiles = []
+        for turn in range(3):
+            run = []
+            i += di
+            j += dj
+            while 0 <= i < self.__board_height and 0 <= j < width and board[i * width + j] == self.EMPTY:
+                run.append((i, j))
+                i += di
+                j += dj
+            if 0 <= i < self.__board_height and 0 <= j < width:
+                found_tiles.append((i, j))
+            if len(run) == 0:
+                break
+            i, j = run[self.__random.randrange(len(run))]
+            if self.__random.randrange(2) == 0:
+                di, dj = dj, di
+            else:
+                di, dj = -dj, -di
+        for preferred in ([found_tile for found_tile in found_tiles
+                           if abs(found_tile[0] - tile[0]) + abs(found_tile[1] - tile[1]) > 1],
+                          [found_tile for found_tile in found_tiles if self.__is_edge_cell(*found_tile)]):
+            if len(preferred) > 0:
+                found_tiles = preferred
+        if len(found_tiles) == 0:
+            return None
+        return found_tiles[self.__random.randrange(len(found_tiles))]
+
+    def __is_edge_cell(self, i:int, j:int):
+        """If (i, j) is a cell of the board (not of its border) next to its border."""
+        return i == 1 or j == 1 or i == self.height or j == self.width
+
+    def __first_joinable_pair(self, board:array):
+        """
+        Return a pair of tiles that can always be joined: the first tile of the board (all the
+        cells above it are empty) and the next tile in its row, or the upper tile of another
+        column (going through the row of the first tile), or the next tile in its column.
+        """
+        width = self.__board_width
+        cells = [(i, j) for i in range(1, self.height + 1) for j in range(1, self.width + 1)
+                 if board[i * width + j] != self.EMPTY]
+        first_i, first_j = cells[0]
+        if len(cells) > 1 and cells[1][0] == first_i:
+            return cells[0], cells[1]
+        for cell in cells[1:]:
+            if cell[1] != first_j:
+                return cells[0], cell
+        return cells[0], cells[1]
 
     def print_board(self):
-        for i in range(len(self.tile_board)):
-            for j in range(len(self.tile_board[0])):
-                if self.tile_board[i][j] is None:
+        for i in range(self.__board_height):
+            for j in range(self.__board_width):
+                if not self.is_a_tile(i, j):
                     print("*", end=" ")
                 else:
-                    print(self.tile_board[i][j], end=" ")
+                    print(self.get_tile_index(i, j), end=" ")
             print()
         print()
 
@@ -181,588 +346,501 @@ class Board:
         """
         if self.tile_board is None:
             return -1, -1
-        return len(self.tile_board[0]), len(self.tile_board)
+        return self.__board_width, self.__board_height
 
     def is_a_tile(self,i:int, j:int):
-        return not self.tile_board[i][j] is None
+        return self.tile_board[i * self.__board_width + j] != self.EMPTY
 
     def __is_possible_cell(self, i, j):
-        if i >= len(self.tile_board) or i < 0 or j >= len(self.tile_board[0]) or j < 0:
+        if i >= self.__board_height or i < 0 or j >= self.__board_width or j < 0:
             return False
         return True
 
-    def __is_crashed(self, i, j):
-        if self.tile_board[i][j] != None:
-            return True
-        return False
-
-    def __same_column_tiles(self, I1, J1, I2, J2):
-        # I1 and J1 are variables tha represent the tile which is above
-        lines = ""
-        i = I1
-        j = J1
-        while self.__is_possible_cell(i, j):
-            i += 1
-            if not self.__is_possible_cell(i, j):
-                break
-            if self.__is_crashed(i, j):
-                if i == I2 and j == J2:
-                    lines += (self.DOWN * (I2 - I1))
-                else:
-                    break
-        return lines
-
-    def __to_left_right_side(self, i1: int, j1: int, i2: int, j2: int):
+    def __generate_playable_board(self):
+        if self.__is_possible_play():
+            return
+        initial_time = time.perf_counter()
+        self.__recovery_attempts = 0
+        if self.reshuffle == self.TARGETED_RESHUFFLE:
+            self.__swap_to_create_movement()
+        else:
+            if self.__is_recording():
+                tile_positions = self.__get_tile_positions()
+                ids_before = [self.get_tile_index(*position) for position in tile_positions]
+            while not self.__is_possible_play():
+                self.__recovery_attempts += 1
+                self.__shuffle_tiles()
+            if self.__is_recording():
+                self.__record_permutation(tile_positions, ids_before)
+        self.__recovery_microseconds = int((time.perf_counter() - initial_time) * 1000000)
+        if self.__stats is not None:
+            self.__stats.add("recovery", self.__recovery_microseconds / 1000000)
+            self.__stats.add("recovery_attempts", calls=self.__recovery_attempts)
+
+    def __swap_to_create_movement(self):
         """
-        I1 and J1 belong to the position of the tile which is above
-        This form:
-        -   -
-        |    |
-        -   -
+        Walk from a random tile until another tile is found, the walk is a path to it. Then that
+        tile is swapped with the partner of the first one, so they can be joined.
+        If there is not luck after MAX_MISSED_WALKS attempts, the same is done with the pair of
+        __first_joinable_pair, so there is always a movement after a swap.
         """
-        lines = ""
-        i = i1
-        j = j1
-        found = False
-        # From left side of the tile-----------------------------------------------
-        while self.__is_possible_cell(i, j) and not found:
-            is_vertical_fail = False
-            i = i1
-            j -= 1
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-
-            for vertical_i in range(i1 + 1, i2 + 1, 1):  # To check if there is an empty column between rows I1 and I2
-                if self.__is_crashed(vertical_i, j):
-                    is_vertical_fail = True
-                    break
-            if not is_vertical_fail:
-                for horizontal_j in range(j + 1, j2 + 1, 1):
-                    if self.__is_crashed(i2, horizontal_j):  # I2, because there is a column free until I2
-                        if horizontal_j == j2:
-                            found = True
-                            lines = (self.LEFT * abs(j1 - j)) + (self.DOWN * abs(i2 - i1)) + (self.RIGHT * (j2 - j))
-                        else:
-                            break
-        # -----------------------------------------------------------------------
-
-        # From right side of the tile--------------------------------------------------------
-        i = i1
-        j = j1
-        while self.__is_possible_cell(i, j) and not found:
-            j += 1
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-            vertical_fail = False
-            for vertical_i in range(i1 + 1, i2 + 1, 1):
-                if self.__is_crashed(vertical_i, j):
-                    vertical_fail = True
-                    break
-            if not vertical_fail:
-                for horizontal_j in range(j - 1, j2 - 1, -1):
-                    if self.__is_crashed(i2, horizontal_j):
-                        if horizontal_j == j2:
-                            found = True
-                            lines = (self.RIGHT * abs(j - j1)) + (self.DOWN * abs(i2 - i1)) + (self.LEFT * abs(j - j2))
-                        else:
-                            break
-        # -----------------------------------------------------------------------------------
-        return lines
-
-    def __same_row_tiles(self, I1: int, J1: int, I2: int, J2: int, left: bool):
-        # I1 and J1 are variables tha represent the tile which is in left side
-        lines = ""
-        i = I1
-        j = J1
-        increment = 1
-        if not left:
-            increment = -1
-        while self.__is_possible_cell(i, j):
-            j += increment
-            if not self.__is_possible_cell(i, j):
-                break
-            if self.__is_crashed(i, j):
-                if i == I2 and j == J2:
-                    if left:
-                        lines += (self.RIGHT * abs(J2 - J1))
-                    else:
-                        lines += (self.LEFT * abs(J2 - J1))
-                else:
-                    break
-        return lines
-
-    def __to_up_down_side(self, I1: int, J1: int, I2: int, J2: int, left: bool):
+        tiles = [position for positions in self.tile_data_position for position in positions]
+        for attempt in range(self.MAX_MISSED_WALKS):
+            self.__recovery_attempts += 1
+            tile = tiles[self.__random.randrange(len(tiles))]
+            found_tile = self.__random_partner(self.tile_board, tile)
+            if found_tile is None or self.get_tile_index(*found_tile) == self.get_tile_index(*tile):
+                continue
+            self.__swap_with_partner(tile, found_tile)
+            return
+        self.__recovery_attempts += 1
+        self.__swap_with_partner(*self.__first_joinable_pair(self.tile_board))
+
+    def __swap_with_partner(self, tile:tuple, found_tile:tuple):
+        """Swap found_tile with other tile with the id of tile, so tile and found_tile can be
+        joined if there is a path between them."""
+        for partner in self.tile_data_position[self.get_tile_index(*tile)]:
+            if partner != tile:
+                self.__swap_tiles(partner, found_tile)
+                if self.__is_recording():
+                    self.__history.extend((self.__SWAP_RECORD, *partner, *found_tile))
+                return
+
+    def __swap_tiles(self, position_1:tuple, position_2:tuple):
+        """Swap two tiles of the board. The empty cells do not change, so only the pairs of
+        these two tiles have to be checked again."""
+        self.__ranked_pairs = None
+        id_1 = self.get_tile_index(*position_1)
+        id_2 = self.get_tile_index(*position_2)
+        for id in (id_1, id_2):
+            for pair in self.__group_pairs(self.tile_data_position[id]):
+                del self.__tile_pairs[pair]
+                self.__connectable_pairs.pop(pair, None)
+        self.tile_data_position[id_1][self.tile_data_position[id_1].index(position_1)] = position_2
+        self.tile_data_position[id_2][self.tile_data_position[id_2].index(position_2)] = position_1
+        self.tile_board[position_1[0] * self.__board_width + position_1[1]] = id_2
+        self.tile_board[position_2[0] * self.__board_width + position_2[1]] = id_1
+        pairs = self.__group_pairs(self.tile_data_position[id_1]) + self.__group_pairs(self.tile_data_position[id_2])
+        for pair in pairs:
+            self.__tile_pairs[pair] = None
+        for pair in self.__find_connectable(pairs):
+            self.__connectable_pairs[pair] = None
+
+    def solve(self, time_budget:float = 1.0):
         """
-        This form:
-         _
-        | | |_|
+        Search an order to clear the current board without shuffling it.
+        Return (result, sequence) like BoardSolver.solve.
         """
-        lines = ""
-        i = I1
-        j = J1
-        found = False
-        one = 1
-        if not left:
-            one = -1
-
-        # From up side of the tile-----------------------------------------------------------------
-        while self.__is_possible_cell(i, j) and not found:
-            is_horizontal_fail = False
-            j = J1
-            i -= 1
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-            for horizontal_j in range(J1 + one, J2 + one, one):  # To check if there is an empty column between rows I1 and I2
-                if self.__is_crashed(i, horizontal_j):
-                    is_horizontal_fail = True
-                    break
-            if not is_horizontal_fail:
-                for vertical_i in range(i + 1, I2 + 1, 1):
-                    if self.__is_crashed(vertical_i, J2):  # I2, because there is a column free until I2
-                        if vertical_i == I2:
-                            found = True
-                            if left:
-                                lines = (self.UP * abs(I1 - i)) + (self.RIGHT * abs(J2 - J1)) + (self.DOWN * abs(I2 - i))
-                            else:
-                                lines = (self.UP * abs(I1 - i)) + (self.LEFT * abs(J1 - J2)) + (self.DOWN * abs(I2 - i))
-                        else:
-                            break
-        # ---------------------------------------------------------------------------------------------
-
-        # From down side of the tile-------------------------------------------------------------------
-        i = I1
-        while self.__is_possible_cell(i, j) and not found:
-            is_horizontal_fail = False
-            j = J1
-            i += 1
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-            for horizontal_j in range(J1 + one, J2 + one, one):
-                if self.__is_crashed(i, horizontal_j):
-                    is_horizontal_fail = True
-                    break
-            if not is_horizontal_fail:
-                for vertical_i in range(i - 1, I2 - 1, -1):
-                    if self.__is_crashed(vertical_i, J2):  # I2, because there is a column free until I2
-                        if vertical_i == I2:
-                            found = True
-                            if left:
-                                lines = (self.DOWN * abs(i - I1)) + (self.RIGHT * abs(J2 - J1)) + (self.UP * abs(i - I2))
-                            else:
-                                lines = (self.DOWN * abs(i - I1)) + (self.LEFT * abs(J1 - J2)) + (self.UP * abs(i - I2))
-                        else:
-                            break
-        # --------------------------------------------------------------------------------------------
-        return lines
-
-    def __border_side_lines(self, I1: int, J1: int, I2: int, J2: int, to_left: bool):
-        lines = ""
-        i = I1
-        j = J1
-        found = False
-        increment = 1
-        if not to_left:
-            increment = -1
-        # From a side of the tile----------------------------------------------------------------
-        # _   _
-        #  | |
-        horizontal_fail = False
-        for horizontal_j in range(J1 + increment, J2 + increment, increment):
-            if self.__is_crashed(I1, horizontal_j):
-                horizontal_fail = True
-                break
-        if not horizontal_fail:
-            for vertical_i in range(I1 + 1, I2 + 1, 1):
-                if self.__is_crashed(vertical_i, J2):
-                    if vertical_i == I2:
-                        if to_left:
-                            lines = (self.RIGHT * abs(J2 - J1)) + (self.DOWN * abs(I2 - I1))
-                        else:
-                            lines = (self.LEFT * abs(J1 - J2)) + (self.DOWN * abs(I2 - I1))
-                        found = True
-                    break
-        # -----------------------------------------------------------------------
-
-        # From down side of the tile------------------------------------------------------------
-        # |_  _|
-        if not found:
-            vertical_fail = False
-            for vertical_i in range(I1 + 1, I2 + 1, 1):
-                if self.__is_crashed(vertical_i, J1):
-                    vertical_fail = True
-                    break
-            if not vertical_fail:
-                for horizontal_j in range(J1 + increment, J2 + increment, increment):
-                    if self.__is_crashed(I2, horizontal_j):
-                        if horizontal_j == J2:
-                            if to_left:
-                                lines = (self.DOWN * abs(I2 - I1)) + (self.RIGHT * abs(J2 - J1))
-                            else:
-                                lines = (self.DOWN * abs(I2 - I1)) + (self.LEFT * abs(J1 - J2))
-                        break
-        # --------------------------------------------------------------------
-        return lines
+        return BoardSolver(self).solve(time_budget)
 
-    def __stair_side(self, i1: int, j1: int, i2: int, j2: int, to_left):
+    def get_recovery_report(self):
         """
-        I1 and J1 are the coordinates of the tile that is above.
-        This Form:
-        |_    _|      _  _
-          |  |      _|    |_
+        Return a dictionary with the attempts (shuffles of the board or swaps tried) and the
+        microseconds that took to get a movement the last time the board was left without one.
         """
-        lines = ""
-        found = False
-        i = i1
-        j = j1
-        increment = 1
-        if not to_left:
-            increment = -1
-        # Stair from down side--------------------------------------------------
-        while self.__is_possible_cell(i, j) and not found:
-            i += 1
-            j = j1
-            horizontal_fail = False
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-
-            for horizontal_j in range(j + increment, j2 + increment, increment):
-                if self.__is_crashed(i, horizontal_j):
-                    horizontal_fail = True
-                    break
-
-            if not horizontal_fail:
-                for vertical_i in range(i + 1, i2 + 1, 1):
-                    if self.__is_crashed(vertical_i, j2):
-                        if vertical_i == i2:
-                            if to_left:
-                                lines = (self.DOWN * abs(i - i1)) + (self.RIGHT * abs(j2 - j1)) + (self.DOWN * abs(i2 - i))
-                            else:
-                                lines = (self.DOWN * abs(i - i1)) + (self.LEFT * abs(j1 - j2)) + (self.DOWN * abs(i2 - i))
-                            found = True
-                        else:
-                            break
-        # ----------------------------------------------------------------------------------------------
-
-        # Stair fom a side------------------------------------------------------------------------------
-        if not found:
-            i = i1
-            j = j1
-            increment = 1
-            if not to_left:
-                increment = -1
-        while self.__is_possible_cell(i, j) and not found:
-            j += increment
-            if not self.__is_possible_cell(i, j) or self.__is_crashed(i, j):
-                break
-            vertical_fail = False
-            for vertical_i in range(i1 + 1, i2 + 1, 1):
-                if self.__is_crashed(vertical_i, j):
-                    vertical_fail = True
-                    break
-            if not vertical_fail:
-                for horizontal_j in range(j + increment, j2 + increment, increment):
-                    if self.__is_crashed(i2, horizontal_j):
-                        if horizontal_j == j2:
-                            if to_left:
-                                lines = (self.RIGHT * abs(j - j1)) + (self.DOWN * abs(i2 - i1)) + (self.RIGHT * abs(j2 - j))
-                            else:
-                                lines = (self.LEFT * abs(j1 - j)) + (self.DOWN * abs(i2 - i1)) + (self.LEFT * abs(j - j2))
-                            found = True
-                        break
-        return lines
-
-    def __generate_playable_board(self):
-        while not self.__is_possible_play():
-            self.__shuffle_tiles()
+        return {
+            "attempts": self.__recovery_attempts,
+            "microseconds": self.__recovery_microseconds,
+        }
 
     def __movement_done(self):
         self.eliminated_tiles += 1
         if self.eliminated_tiles == (self.width * self.height) // 2:
             self.ready_to_play = False
 
-    def __get_positions_by_line(self, incomplete_lines:str, i:str, j:str):
-        """incomplete_lines will content the lines without turns.
-        i and j are variables to store the initial position of a path."""
-        positions = [(i, j)]
-        for line in incomplete_lines:
-            if line == self.RIGHT:
-                j += 1
-            elif line == self.LEFT:
-                j -= 1
-            elif line == self.UP:
-                i -= 1
-            elif line == self.DOWN:
-                i += 1
-            positions.append((i, j))
-        return positions
-
-
     def play_movement(self, i1, j1, i2, j2):
-        lines = ""
+        """Remove the tiles of (i1, j1) and (i2, j2) if they can be joined. Return the Path from
+        the upper tile to the other one, it is empty if they can not be joined."""
+        path = Path()
         if not self.__is_possible_cell(i1, j1) or not self.__is_possible_cell(i2, j2):
-            return lines
-        elif not self.tile_board[i1][j1] == self.tile_board[i2][j2]:
-            return lines
-        initial_i = 0
-        initial_j = 0
-        positions = []
-        if i1 <= i2:
-            lines = self.__make_lines(i1, j1, i2, j2)
-            initial_i = i1
-            initial_j = j1
-        else:
-            lines = self.__make_lines(i2, j2, i1, j1)
-            initial_i = i2
-            initial_j = j2
-
-        if lines != "":
-            self.tile_board[i1][j1] = None
-            self.tile_board[i2][j2] = None
+            return path
+        elif not self.get_tile_index(i1, j1) == self.get_tile_index(i2, j2):
+            return path
+        path = self.__make_path(*self.__above_tile(i1, j1, i2, j2))
+
+        if not path.is_empty():
+            id = self.get_tile_index(i1, j1)
+            removed_pair = self.__pair_key((i1, j1), (i2, j2))
+            self.__remove_tiles(removed_pair, id)
+            new_pairs = self.__update_move_index(removed_pair, id)
+            self.__record_move(removed_pair, id, new_pairs)
             self.__movement_done()
-            positions = self.__get_positions_by_line(lines, initial_i,initial_j)  # To get the psitions of every tile in the path
-            lines = self.__get_correct_lines(lines)
             if self.is_finished():
                 self.game_state = self.FINISH
             elif not self.is_finished() and not self.__is_possible_play():
                 self.__generate_playable_board()
 
-        return positions
+        return path
+
+    def __remove_tiles(self, removed_pair:tuple, id:int):
+        for i, j in removed_pair:
+            self.tile_data_position[id].remove((i, j))
+            self.tile_board[i * self.__board_width + j] = self.EMPTY
+            self.__connectivity.set_empty(i, j)
+
+    def __get_tile_positions(self):
+        """Return the positions of the tiles of the board, row by row."""
+        return [(i, j) for i in range(1, self.height + 1) for j in range(1, self.width + 1)
+                if self.tile_board[i * self.__board_width + j] != self.EMPTY]
+
+    def __is_recording(self):
+        """The history only starts with the first movement, the boards created by init_board are not in it."""
+        return len(self.__steps) > 0
+
+    def __clear_history(self):
+        self.__history = array("h")
+        self.__steps = array("i")
+        self.__done_steps = 0
+
+    def __record_move(self, removed_pair:tuple, id:int, new_pairs:list):
+        """Start a new step with a movement, the steps that were undone can not be redone any more."""
+        if self.__done_steps < len(self.__steps):
+            del self.__history[self.__steps[self.__done_steps]:]
+            del self.__steps[self.__done_steps:]
+        self.__steps.append(len(self.__history))
+        self.__done_steps += 1
+        (i1, j1), (i2, j2) = removed_pair
+        self.__history.extend((self.__MOVE_RECORD, i1, j1, i2, j2, id, len(new_pairs)))
+        for (pair_i1, pair_j1), (pair_i2, pair_j2) in new_pairs:
+            self.__history.extend((pair_i1, pair_j1, pair_i2, pair_j2))
+
+    def __record_permutation(self, tile_positions:list, ids_before:list):
+        """Add to the current step how the ids of the tiles in tile_positions were moved."""
+        indexes_by_id = {}
+        for index in range(len(ids_before)):
+            indexes_by_id.setdefault(ids_before[index], []).append(index)
+        self.__history.extend((self.__PERMUTATION_RECORD, len(tile_positions)))
+        for position in tile_positions:
+            self.__history.append(indexes_by_id[self.get_tile_index(*position)].pop())
+
+    def can_undo(self):
+        return self.__done_steps > 0
+
+    def can_redo(self):
+        return self.__done_steps < len(self.__steps)
+
+    def undo_movement(self):
+        """
+        Put back the tiles of the last movement and undo the shuffles that came after it.
+        The pairs that the movement made playable are stored in the history, so only the pairs
+        of the tiles that come back are checked again. Return the positions of those tiles,
+        or None if there is not a movement to undo.
+        """
+        if not self.can_undo():
+            return None
+        self.__done_steps -= 1
+        records = self.__get_step_records(self.__done_steps)
+        for offset in reversed(records[1:]):
+            self.__apply_record(offset, False)
+        offset = records[0]
+        i1, j1, i2, j2, id, new_pairs = self.__history[offset + 1 : offset + 7]
+        removed_pair = ((i1, j1), (i2, j2))
+        self.__ranked_pairs = None
+        for index in range(offset + 7, offset + 7 + 4 * new_pairs, 4):
+            pair_i1, pair_j1, pair_i2, pair_j2 = self.__history[index : index + 4]
+            del self.__connectable_pairs[((pair_i1, pair_j1), (pair_i2, pair_j2))]
+        for i, j in removed_pair:
+            self.tile_board[i * self.__board_width + j] = id
+            self.__connectivity.set_empty(i, j, False)
+        pairs = [removed_pair]
+        for position in removed_pair:
+            for other_position in self.tile_data_position[id]:
+                pairs.append(self.__pair_key(position, other_position))
+        self.tile_data_position[id].extend(removed_pair)
+        for pair in pairs:
+            self.__tile_pairs[pair] = None
+        for pair in self.__find_connectable(pairs):
+            self.__connectable_pairs[pair] = None
+        self.eliminated_tiles -= 1
+        self.game_state = self.PLAYING
+        return removed_pair
+
+    def redo_movement(self):
+        """Play again the last movement that was undone, and the shuffles that came after it.
+        Return the Path of the movement, or None if there is not a movement to redo."""
+        if not self.can_redo():
+            return None
+        records = self.__get_step_records(self.__done_steps)
+        self.__done_steps += 1
+        offset = records[0]
+        i1, j1, i2, j2, id, new_pairs = self.__history[offset + 1 : offset + 7]
+        removed_pair = ((i1, j1), (i2, j2))
+        path = Path(self.__connectivity.find_corners(i1, j1, i2, j2))
+        self.__ranked_pairs = None
+        self.__remove_tiles(removed_pair, id)
+        self.__forget_pairs(removed_pair, id)
+        for index in range(offset + 7, offset + 7 + 4 * new_pairs, 4):
+            pair_i1, pair_j1, pair_i2, pair_j2 = self.__history[index : index + 4]
+            self.__connectable_pairs[((pair_i1, pair_j1), (pair_i2, pair_j2))] = None
+        self.__movement_done()
+        for offset in records[1:]:
+            self.__apply_record(offset, True)
+        if self.is_finished():
+            self.game_state = self.FINISH
+        return path
+
+    def __get_step_records(self, step:int):
+        """Return where every record of the step starts in the history."""
+        end = self.__steps[step + 1] if step + 1 < len(self.__steps) else len(self.__history)
+        records = []
+        offset = self.__steps[step]
+        while offset < end:
+            records.append(offset)
+            if self.__history[offset] == self.__MOVE_RECORD:
+                offset += 7 + 4 * self.__history[offset + 6]
+            elif self.__history[offset] == self.__SWAP_RECORD:
+                offset += 5
+            else:
+                offset += 2 + self.__history[offset + 1]
+        return records
+
+    def __apply_record(self, offset:int, forward:bool):
+        """Do (or undo, if forward is False) the swap or the shuffle of the record."""
+        if self.__history[offset] == self.__SWAP_RECORD:
+            i1, j1, i2, j2 = self.__history[offset + 1 : offset + 5]
+            self.__swap_tiles((i1, j1), (i2, j2))
+            return
+        tile_positions = self.__get_tile_positions()
+        ids = [self.get_tile_index(*position) for position in tile_positions]
+        for index in range(len(tile_positions)):
+            other_index = self.__history[offset + 2 + index]
+            if forward:
+                position = tile_positions[index]
+                id = ids[other_index]
+            else:
+                position = tile_positions[other_index]
+                id = ids[index]
+            self.tile_board[position[0] * self.__board_width + position[1]] = id
+        for tile_positions_of_id in self.tile_data_position:
+            tile_positions_of_id.clear()
+        for position in tile_positions:
+            self.tile_data_position[self.get_tile_index(*position)].append(position)
+        self.__rebuild_move_index()
 
     def __shuffle_tiles(self):
+        initial_time = time.perf_counter() if self.__stats is not None else 0
         tile_positions = []
         tile_id = []
-        for i in range(len(self.tile_board)):
-            for j in range(len(self.tile_board[0])):
-                if not self.tile_board[i][j] is None:
-                    tile_positions.append([i, j])
-                    tile_id.append(self.tile_board[i][j].id)
-        shuffle(tile_id)
+        for id in range(len(self.tile_data_position)):
+            for position in self.tile_data_position[id]:
+                tile_positions.append(position)
+                tile_id.append(id)
+            self.tile_data_position[id].clear()
+        self.__random.shuffle(tile_id)
         id_index = 0
         for position_index in tile_positions:
-            self.tile_board[position_index[0]][position_index[1]] = copy.deepcopy(self.tile_data[tile_id[id_index]])
-
+            self.tile_board[position_index[0] * self.__board_width + position_index[1]] = tile_id[id_index]
+            self.tile_data_position[tile_id[id_index]].append(position_index)
             id_index += 1
+        self.__rebuild_move_index()
+        if self.__stats is not None:
+            self.__stats.add("shuffle_tiles", time.perf_counter() - initial_time)
 
     def get_advised_tile_pair(self):
-
-        if not self.__is_possible_play():
+        advised_pairs = self.get_advised_tile_pairs(1)
+        if len(advised_pairs) == 0:
             return self.ADVISED_TILE_ERROR
-        tile_index_position = list(range(len(self.tile_data)))
-        tile_index_position = list(map(lambda x: [], tile_index_position))
-        # This piece of code is to store all the tile pairs in an equal index
-        # In this we can prove faster the path from a tile to another one.
-        # -------------------------------------------------------------
-        for i in range(len(self.tile_board)):
-            for j in range(len(self.tile_board[0])):
-                if not self.tile_board[i][j] is None:
-                    tile_index_position[self.tile_board[i][j].id].append(i)
-                    tile_index_position[self.tile_board[i][j].id].append(j)
-        # -----------------------------------------------------------
-        for tile_pair in tile_index_position:
-            if not len(tile_pair) == 0:
-                # This line is to sort the tiles by the I index
-                # This line could raise an Exception. If there is a tile that has not pair
-                # the program will raise an index out of range Exception
-                indexes = self.__above_tile(tile_pair[0], tile_pair[1], tile_pair[2], tile_pair[3])
-                lines = self.__make_lines(indexes[0], indexes[1], indexes[2], indexes[3])
-                if lines != "":
-                    return [[indexes[0], indexes[1]], [indexes[2], indexes[3]]]
-        return self.ADVISED_TILE_ERROR
+        return advised_pairs[0]
+
+    def get_advised_tile_pairs(self, quantity:int):
+        """
+        Return the best pairs that can be played, at most quantity of them, like
+        [[[i1, j1], [i2, j2]], ...]. The pairs that leave a movement on the board when they are
+        removed are the best ones, then the ones with less turns and then the shorter ones.
+        The ranking is kept until the board changes.
+        """
+        initial_time = time.perf_counter() if self.__stats is not None else 0
+        if self.__ranked_pairs is None:
+            self.__ranked_pairs = self.__rank_pairs()
+            if self.__stats is not None:
+                self.__stats.add("hint_ranking", time.perf_counter() - initial_time)
+        advised_pairs = []
+        for position_1, position_2 in self.__ranked_pairs[:quantity]:
+            advised_pairs.append([list(position_1), list(position_2)])
+        if self.__stats is not None:
+            self.__stats.add("hint", time.perf_counter() - initial_time)
+        return advised_pairs
+
+    def __rank_pairs(self):
+        ranking = []
+        for position_1, position_2, path in self.iter_legal_moves():
+            pair = (position_1, position_2)
+            # Removing tiles does not break paths, so with other pairs of other tiles the board stays playable
+            keeps_movement = False
+            for other_pair in self.__connectable_pairs:
+                if other_pair[0] not in pair and other_pair[1] not in pair:
+                    keeps_movement = True
+                    break
+            keeps_movement = keeps_movement or self.__opens_movement(pair)
+            ranking.append((not keeps_movement, path.get_turns(), len(path), pair))
+        ranking.sort(key=lambda rank: rank[:3])
+        return [rank[3] for rank in ranking]
+
+    def iter_legal_moves(self):
+        """
+        Yield (position_1, position_2, path) for every pair of tiles that can be played now,
+        position_1 is the upper tile (or the left one) and path is the Path from it to the
+        other tile. The pairs come sorted by their positions and every path is only searched
+        when it is reached, so the iteration can be stopped at any moment.
+        If the board changes during the iteration, the pairs that can not be played any more
+        are skipped, but the new ones are not yielded.
+        """
+        for pair in sorted(self.__connectable_pairs):
+            if pair in self.__connectable_pairs:
+                yield pair[0], pair[1], Path(self.__connectivity.find_corners(*pair[0], *pair[1]))
+
+    def __opens_movement(self, removed_pair:tuple):
+        """If some other pair could be played after removing removed_pair."""
+        for i, j in removed_pair:
+            self.__connectivity.set_empty(i, j)
+        pairs = [pair for pair in self.__tile_pairs if pair[0] not in removed_pair and pair[1] not in removed_pair]
+        opens_movement = len(self.__find_connectable(pairs)) > 0
+        for i, j in removed_pair:
+            self.__connectivity.set_empty(i, j, False)
+        return opens_movement
 
     def __is_possible_play(self):
-        tile_index_position = list(range(len(self.tile_data)))
-        tile_index_position = list(map(lambda x: [], tile_index_position))
-        # This piece of code is to store all the tile pairs in an equal index
-        # In this we can prove faster the path from a tile to another one.
-        # -------------------------------------------------------------
-        for i in range(len(self.tile_board)):
-            for j in range(len(self.tile_board[0])):
-                if not self.tile_board[i][j] is None:
-                    tile_index_position[self.tile_board[i][j].id].append(i)
-                    tile_index_position[self.tile_board[i][j].id].append(j)
-        # -----------------------------------------------------------
-        for tile_pair in tile_index_position:
-            if not len(tile_pair) == 0:
-                # This line is to sort the tiles by the I index
-                # This line could raise an Exception. If there is a tile that has not pair
-                # the program will raise an index out of range Exception
-                indexes = self.__above_tile(tile_pair[0], tile_pair[1], tile_pair[2], tile_pair[3])
-                lines = self.__make_lines(indexes[0], indexes[1], indexes[2], indexes[3])
-                if lines != "":
-                    return True
-        return False
-
-    def __get_correct_lines(self, lines):
-        correct_lines = ""
-        x = 0
-        y = 1
-        correct_lines += lines[x]
-        while x <= len(lines) - 1:
-            if x == len(lines) - 1:
-                correct_lines += lines[x]
-                x += 1
-                y += 1
+        if self.__stats is not None:
+            self.__stats.add("is_possible_play")  # It is too fast to be timed
+        return len(self.__connectable_pairs) > 0
+
+    def __pair_key(self, position_1:tuple, position_2:tuple):
+        """The pairs are stored with the tile which is above (or in the left side) first."""
+        if position_1 <= position_2:
+            return position_1, position_2
+        return position_2, position_1
+
+    def __rebuild_move_index(self):
+        """Check again every pair of the board, this is needed when all the tiles change
+        their positions."""
+        self.__ranked_pairs = None
+        self.__tile_pairs.clear()
+        self.__connectable_pairs.clear()
+        for tile_positions in self.tile_data_position:
+            for pair in self.__group_pairs(tile_positions):
+                self.__tile_pairs[pair] = None
+        for pair in self.__find_connectable(list(self.__tile_pairs)):
+            self.__connectable_pairs[pair] = None
+
+    def __group_pairs(self, positions:list):
+        """Return every pair of positions of a group, the tiles with the same id."""
+        pairs = []
+        for first in range(len(positions)):
+            for second in range(first + 1, len(positions)):
+                pairs.append(self.__pair_key(positions[first], positions[second]))
+        return pairs
+
+    def __find_connectable(self, pairs:list):
+        """
+        Return the pairs of pairs that can be played now.
+        A path goes along the row (or the column) of each tile until both meet, so the pairs
+        whose reachable columns, and whose reachable rows, do not meet (the tiles next to each
+        other meet with one cell more) are discarded before checking their paths.
+        """
+        reaches = {}
+        candidates = []
+        for pair in pairs:
+            for position in pair:
+                if position not in reaches:
+                    reaches[position] = self.__connectivity.reach(*position)
+            first_column_1, last_column_1, first_row_1, last_row_1 = reaches[pair[0]]
+            first_column_2, last_column_2, first_row_2, last_row_2 = reaches[pair[1]]
+            if ((first_column_1 <= last_column_2 + 1 and first_column_2 <= last_column_1 + 1)
+                    or (first_row_1 <= last_row_2 + 1 and first_row_2 <= last_row_1 + 1)):
+                candidates.append(pair)
+        return [pair for pair in candidates if self.__connectivity.is_connectable(*pair[0], *pair[1])]
+
+    def __update_move_index(self, removed_pair:tuple, id:int):
+        """
+        Removing tiles only frees cells, so the pairs that could already be played are still
+        playable. Only the pairs that could not be played and whose rows or columns (the ones
+        between its two tiles) contain a freed cell are checked again.
+        id is the id of the removed tiles, its other tiles lose their pairs with them.
+        Return the pairs that can be played now and could not before.
+        """
+        self.__ranked_pairs = None
+        self.__forget_pairs(removed_pair, id)
+        pairs = []
+        for pair in self.__tile_pairs:
+            if pair in self.__connectable_pairs:
                 continue
-            characters = lines[x : y + 1]
-            if self.LEFT in characters and self.UP in characters:
-                if self.LEFT == characters[0]:
-                    correct_lines += self.TURN_FROM_RIGHT_TO_UP
-                else:
-                    correct_lines += self.TURN_FROM_LEFT_TO_DOWN
+            (i1, j1), (i2, j2) = pair
+            low_j, high_j = min(j1, j2), max(j1, j2)
+            for i, j in removed_pair:
+                if i1 <= i <= i2 or low_j <= j <= high_j:
+                    pairs.append(pair)
+                    break
+        new_pairs = self.__find_connectable(pairs)
+        for pair in new_pairs:
+            self.__connectable_pairs[pair] = None
+        rechecked_pairs = len(pairs)
+        self.__last_rechecked_pairs = rechecked_pairs
+        self.__last_full_rescan_pairs = len(self.__tile_pairs)
+        self.__rechecked_pairs += rechecked_pairs
+        self.__full_rescan_pairs += len(self.__tile_pairs)
+        return new_pairs
+
+    def __forget_pairs(self, removed_pair:tuple, id:int):
+        """Remove from the index the pairs of the removed tiles, the ones between them and the
+        ones with the other tiles of id."""
+        for position in removed_pair:
+            for other_position in self.tile_data_position[id]:
+                pair = self.__pair_key(position, other_position)
+                del self.__tile_pairs[pair]
+                self.__connectable_pairs.pop(pair, None)
+        del self.__tile_pairs[removed_pair]
+        self.__connectable_pairs.pop(removed_pair, None)
+
+    def enable_stats(self, enabled:bool = True):
+        """Start (or stop) measuring the calls and the time of the operations of the board.
+        When they are not enabled the board only checks that they are not."""
+        if not enabled:
+            self.__stats = None
+        elif self.__stats is None:
+            self.__stats = Stats()
+
+    def get_stats(self):
+        """
+        Return {name: {"calls": calls, "seconds": seconds}} for the measured operations, an empty
+        dictionary if the stats are not enabled: path_search, is_possible_play (without time),
+        shuffle_tiles, recovery (a board without movements fixed, recovery_attempts has its
+        shuffles or swaps), hint and hint_ranking (when the hints were ranked again).
+        """
+        if self.__stats is None:
+            return {}
+        return self.__stats.get()
 
-            elif self.RIGHT in characters and self.UP in characters:
-                if self.RIGHT == characters[0]:
-                    correct_lines += self.TURN_FROM_LEFT_TO_UP
-                else:
-                    correct_lines += self.TURN_FROM_RIGHT_TO_DOWN
+    def reset_stats(self):
+        if self.__stats is not None:
+            self.__stats.reset()
 
-            elif self.LEFT in characters and self.DOWN in characters:
-                if self.LEFT == characters[0]:
-                    correct_lines += self.TURN_FROM_RIGHT_TO_DOWN
-                else:
-                    correct_lines += self.TURN_FROM_LEFT_TO_UP
-            elif self.RIGHT in characters and self.DOWN in characters:
-                if self.RIGHT == characters[0]:
-                    correct_lines += self.TURN_FROM_LEFT_TO_DOWN
-                else:
-                    correct_lines += self.TURN_FROM_RIGHT_TO_UP
-            else:
-                correct_lines += lines[x]
-            x += 1
-            y += 1
-        return correct_lines
+    def get_move_index_counters(self):
+        """
+        Return a dictionary with the quantity of pairs that were checked again after the last
+        movement and the quantity that a full rescan of the board would have checked, and the
+        same quantities accumulated for all the movements since the board was created.
+        """
+        return {
+            "last_rechecked_pairs": self.__last_rechecked_pairs,
+            "last_full_rescan_pairs": self.__last_full_rescan_pairs,
+            "rechecked_pairs": self.__rechecked_pairs,
+            "full_rescan_pairs": self.__full_rescan_pairs,
+        }
 
     def __above_tile(self, i1, j1, i2, j2):
         if i1 <= i2:
             return i1, j1, i2, j2
         return i2, j2, i1, j1
 
-    def __make_lines(self, i1, j1, i2, j2):
-        lines = ""
-        if self.tile_board[i1][j1] == self.tile_board[i2][j2]:
-            if i1 < i2:
-                if j1 == j2:  # In the same column
-                    lines = self.__same_column_tiles(i1, j1, i2, j2)
-                    if lines == "":
-                        lines = self.__to_left_right_side(i1, j1, i2, j2)
-
-                if j1 < j2 and lines == "":  # (i1, j1) In the left
-
-                    lines = self.__border_side_lines(i1, j1, i2, j2, True)
-                    if lines == "":
-                        lines = self.__stair_side(i1, j1, i2, j2, True)
-                    if lines == "":
-                        lines = self.__to_left_right_side(i1, j1, i2, j2)
-                    if lines == "":
-                        lines = self.__to_up_down_side(i1, j1, i2, j2, True)
-
-                if j1 > j2 and lines == "":  # (i1, j1) In the right
-                    lines = self.__border_side_lines(i1, j1, i2, j2, False)
-                    if lines == "":
-                        lines = self.__stair_side(i1, j1, i2, j2, False)
-                    if lines == "":
-                        lines = self.__to_left_right_side(i1, j1, i2, j2)
-                    if lines == "":
-                        lines = self.__to_up_down_side(i1, j1, i2, j2, False)
-            elif i1 == i2:
-                if j1 < j2:
-                    lines = self.__same_row_tiles(i1, j1, i2, j2, True)
-                    if lines == "":
-                        lines = self.__to_up_down_side(i1, j1, i2, j2, True)
-                elif j1 > j2:
-                    lines = self.__same_row_tiles(i1, j1, i2, j2, False)
-                    if lines == "":
-                        lines = self.__to_up_down_side(i1, j1, i2, j2, False)
-        return lines
-
-    def get_lines_by_position(self, positions: list):
-        x = -1
-        y = 0
-        z = 1
-        lines = ""
-
-        while y <= len(positions) - 1:
-            current_line = ""
-            if y == 0:
-                current_line = self.__get_line_given_3_positions(None, positions[y], positions[z])
-            elif y == len(positions) - 1:
-                current_line = self.__get_line_given_3_positions(positions[x], positions[y], None)
-            else:
-                current_line = self.__get_line_given_3_positions(positions[x], positions[y], positions[z])
-            lines += current_line
-            x += 1
-            y += 1
-            z += 1
-        return lines
-
-    def __get_line_given_3_positions(self, x=None, y=None, z=None):
-        line = ""
-        row = 0
-        column = 1
-        if x is None:
-            if y[column] == z[column]:
-                if y[row] > z[row]:
-                    line = self.UP_HALF
-                elif y[row] < z[row]:
-                    line = self.DOWN_HALF
-            elif y[row] == z[row]:
-                if y[column] > z[column]:
-                    line = self.LEFT_HALF
-                elif y[column] < z[column]:
-                    line = self.RIGHT_HALF
-        elif z is None:
-            if y[column] == x[column]:
-                if y[row] > x[row]:
-                    line = self.UP_HALF
-                elif y[row] < x[row]:
-                    line = self.DOWN_HALF
-            elif y[row] == x[row]:
-                if y[column] > x[column]:
-                    line = self.LEFT_HALF
-                elif y[column] < x[column]:
-                    line = self.RIGHT_HALF
-        else:
-            if x[column] != z[column] and x[row] != z[row]:
-                line = self.__get_turned_line(x, y, z)
-            elif x[row] == z[row]:
-                if x[column] < z[column]:
-                    line = self.RIGHT
-                elif x[column] > z[column]:
-                    line = self.LEFT
-            elif x[column] == z[column]:
-                if x[row] < z[row]:
-                    line = self.DOWN
-                elif x[row] > z[row]:
-                    line = self.UP
-        return line
-
-    def __get_turned_line(self, pos_x, pos_y, pos_z):
-        row = 0
-        column = 1
-        line = ""
-        if pos_x[row] > pos_z[row]:
-            if pos_x[column] < pos_z[column]:
-                if pos_x[row] - 1 == pos_y[row]:
-                    line = self.TURN_FROM_RIGHT_TO_DOWN
-                else:
-                    line = self.TURN_FROM_LEFT_TO_UP
-            elif pos_x[column] > pos_z[column]:
-                if pos_x[row] - 1 == pos_y[row]:
-                    line = self.TURN_FROM_LEFT_TO_DOWN
-                else:
-                    line = self.TURN_FROM_RIGHT_TO_UP
-
-        elif pos_x[row] < pos_z[row]:
-            if pos_x[column] < pos_z[column]:
-                if pos_x[row] + 1 == pos_y[row]:
-                    line = self.TURN_FROM_RIGHT_TO_UP
-                else:
-                    line = self.TURN_FROM_LEFT_TO_DOWN
-            elif pos_x[column] > pos_z[column]:
-                if pos_x[row] + 1 == pos_y[row]:
-                    line = self.TURN_FROM_LEFT_TO_UP
-                else:
-                    line = self.TURN_FROM_RIGHT_TO_DOWN
-
-        return line
-
+    def __make_path(self, i1, j1, i2, j2):
+        """Return the Path with the fewest turns, and then the shortest one, from (i1, j1) to
+        (i2, j2). An empty Path is returned if the tiles are not equal or there is not a path."""
+        initial_time = time.perf_counter() if self.__stats is not None else 0
+        path = Path()
+        if self.is_a_tile(i1, j1) and self.get_tile_index(i1, j1) == self.get_tile_index(i2, j2):
+            corners = self.__connectivity.find_corners(i1, j1, i2, j2)
+            if corners is not None:
+                path = Path(corners)
+        if self.__stats is not None:
+            self.__stats.add("path_search", time.perf_counter() - initial_time)
+        return path
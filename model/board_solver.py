@@ -0,0 +1,161 @@
+import time
+from array import array
+from collections import OrderedDict
+from random import Random
+from model.connectivity import Connectivity
+
+
+class BoardSolver:
+    """
+    Search an order to remove all the tiles of a board, without shuffling it.
+    The states of the board are hashed with Zobrist keys (one random number for every cell,
+    the hash of a state is the xor of the keys of its tiles), and the states that can not be
+    cleared are kept in a transposition table that forgets the least recently used ones.
+    The search is repeated, doubling the states that it can explore every time and keeping
+    the table, until there is an answer or the time is over.
+    The tiles with the same id can be joined in any pair, so all of them are tried.
+    A solver is created for a single search.
+    """
+
+    SOLVABLE = "solvable"
+    UNSOLVABLE = "unsolvable"
+    UNKNOWN = "unknown"
+
+    # Results of a search from a state -----
+    __SOLVED = 0
+    __DEAD = 1  # It can not be solved from the state
+    __STOPPED = 2  # There were not more states or time to know it
+    # ---------------------------------------
+
+    FIRST_STATE_LIMIT = 256  # States that can be explored in the first search
+    TIME_CHECK_STATES = 64  # The time is checked every time these states are explored
+
+    def __init__(self, board, table_size:int = 100000, seed:int = 0):
+        """board is the Board to solve, it is not modified."""
+        self.__width, self.__height = board.get_board_size()
+        self.__empty = board.EMPTY
+        self.__tile_board = array("h", board.tile_board)
+        self.__groups = [list(positions) for positions in board.tile_data_position]  # The tiles left of every id
+        self.__pairs_to_clear = sum(len(positions) for positions in self.__groups) // 2
+
+        self.__connectivity = Connectivity(self.__width, self.__height)
+        self.__connectivity.rebuild(self.__tile_board, self.__empty)
+
+        random = Random(seed)
+        self.__keys = [random.getrandbits(64) for cell in range(self.__width * self.__height)]
+        self.__hash = 0
+        for index in range(len(self.__tile_board)):
+            if self.__tile_board[index] != self.__empty:
+                self.__hash ^= self.__keys[index]
+
+        self.__table = OrderedDict()  # The hashes of the states that can not be cleared
+        self.__table_size = table_size
+        self.__sequence = []
+        self.__final_time = 0
+        self.__time_over = False
+        self.__state_limit = 0
+        self.explored_states = 0
+
+    def solve(self, time_budget:float = 1.0):
+        """
+        Return (result, sequence), where result is SOLVABLE, UNSOLVABLE or UNKNOWN (if the time
+        was not enough) and sequence is a list of pairs of positions that clears the board when
+        they are played in order (it is empty if the result is not SOLVABLE).
+        """
+        self.__final_time = time.perf_counter() + time_budget
+        state_limit = self.FIRST_STATE_LIMIT
+        while True:
+            self.__state_limit = self.explored_states + state_limit
+            result = self.__search()
+            if result == self.__SOLVED:
+                return self.SOLVABLE, list(self.__sequence)
+            elif result == self.__DEAD:
+                return self.UNSOLVABLE, []
+            elif self.__time_over or time.perf_counter() > self.__final_time:
+                return self.UNKNOWN, []
+            state_limit *= 2
+
+    def __search(self):
+        """
+        Search from the current state with a depth-first search. It keeps a stack with the pairs
+        that can be played in every state of the sequence and the next one to try, instead of
+        recursion, so the boards can have more pairs than the recursion limit of Python.
+        The board is left as it was unless the result is __SOLVED.
+        """
+        result = self.__enter_state()
+        if result is not None:
+            return result
+        frames = [[self.__connectable_pairs(), 0]]  # The pairs of a state and the index of the next one to try
+        while True:
+            frame = frames[-1]
+            pairs, index = frame
+            if index < len(pairs):
+                frame[1] = index + 1
+                self.__remove_pair(pairs[index])
+                result = self.__enter_state()
+                if result is None:
+                    frames.append([self.__connectable_pairs(), 0])
+                    continue
+            else:
+                self.__store()
+                result = self.__DEAD
+                frames.pop()
+                if len(frames) == 0:
+                    return result
+
+            # result is the one of the state reached with the last pair tried in frames[-1]
+            if result == self.__SOLVED:
+                return result
+            parent = frames[-1]
+            self.__restore_pair(parent[0][parent[1] - 1])
+            if result == self.__STOPPED:
+                while len(self.__sequence) > 0:
+                    self.__restore_pair(self.__sequence[-1])
+                return result
+
+    def __enter_state(self):
+        """Return the result of the current state if it is known without exploring it, or None
+        if it has to be explored."""
+        if len(self.__sequence) == self.__pairs_to_clear:
+            return self.__SOLVED
+        if self.__hash in self.__table:
+            self.__table.move_to_end(self.__hash)
+            return self.__DEAD
+
+        self.explored_states += 1
+        if self.explored_states > self.__state_limit:
+            return self.__STOPPED
+        if self.explored_states % self.TIME_CHECK_STATES == 0 and time.perf_counter() > self.__final_time:
+            self.__time_over = True
+            return self.__STOPPED
+        return None
+
+    def __connectable_pairs(self):
+        pairs = []
+        for positions in self.__groups:
+            for first in range(len(positions)):
+                for second in range(first + 1, len(positions)):
+                    pairs.append((positions[first], positions[second]))
+        return [pair for pair in pairs if self.__connectivity.is_connectable(*pair[0], *pair[1])]
+
+    def __store(self):
+        self.__table[self.__hash] = None
+        if len(self.__table) > self.__table_size:
+            self.__table.popitem(last=False)
+
+    def __remove_pair(self, pair:tuple):
+        self.__sequence.append(pair)
+        for i, j in pair:
+            self.__group(i, j).remove((i, j))
+            self.__hash ^= self.__keys[i * self.__width + j]
+            self.__connectivity.set_empty(i, j)
+
+    def __restore_pair(self, pair:tuple):
+        self.__sequence.pop()
+        for i, j in pair:
+            self.__group(i, j).append((i, j))
+            self.__hash ^= self.__keys[i * self.__width + j]
+            self.__connectivity.set_empty(i, j, False)
+
+    def __group(self, i:int, j:int):
+        return self.__groups[self.__tile_board[i * self.__width + j]]
@@ -1,24 +1,26 @@
 
-import time
+from model.clock import MonotonicClock
 
 class Chronometer:
 
-    def __init__(self):
-        self.__initial_time = time.process_time()
-        self.__final_time = time.process_time()
+    def __init__(self, clock = None):
+        """clock gives the time (MonotonicClock if it is None), like the ones of model.clock."""
+        self.__clock = clock if clock is not None else MonotonicClock()
+        self.__initial_time = self.__clock.time()
+        self.__final_time = self.__clock.time()
         self.__passed_time = 0
         self.__paused = True
 
     def start(self):
         self.__paused = False
-        self.__initial_time = time.process_time()
+        self.__initial_time = self.__clock.time()
 
     def get_current_time(self):
         if self.__paused:
             return self.__passed_time
-        self.__final_time = time.process_time()
+        self.__final_time = self.__clock.time()
         self.__passed_time += self.__final_time - self.__initial_time
-        self.__initial_time = time.process_time()
+        self.__initial_time = self.__clock.time()
         return self.__passed_time
 
     def pause(self):
@@ -31,6 +33,3 @@ class Chronometer:
 
     def increase_time(self, seconds:float):
         self.__passed_time += seconds
-
-    def delay_thread(self, seconds):
-        time.sleep(seconds)
\ No newline at end of file
@@ -0,0 +1,21 @@
+import time
+
+
+class MonotonicClock:
+    """The real time that passes, it never goes back and it counts while the program waits."""
+
+    def time(self):
+        return time.perf_counter()
+
+
+class VirtualClock:
+    """A clock that only moves when it is told to, for games without a screen."""
+
+    def __init__(self):
+        self.__time = 0.0
+
+    def time(self):
+        return self.__time
+
+    def advance(self, seconds:float):
+        self.__time += seconds
@@ -0,0 +1,164 @@
+from array import array
+
+
+class Connectivity:
+    """
+    Says if two cells of the board (with its border of empty cells) can be joined
+    by a path of at most two turns that only crosses empty cells.
+    It keeps a free-run table for every direction: the quantity of consecutive
+    empty cells that starts in a cell and goes in that direction, the cell included.
+    All the tables are flat arrays stored row by row, like the board.
+    """
+
+    def __init__(self, width:int, height:int):
+        """width and height are the dimensions of the board including its border."""
+        self.__width = width
+        self.__height = height
+        self.__empty = array("b", [1]) * (width * height)
+
+        # Free runs ---------------------------------------
+        self.__left = array("h", [0]) * (width * height)
+        self.__right = array("h", [0]) * (width * height)
+        self.__up = array("h", [0]) * (width * height)
+        self.__down = array("h", [0]) * (width * height)
+        # -------------------------------------------------
+
+    def rebuild(self, board:array, empty_value:int):
+        """board is the flat array of the board, where an empty cell has the value empty_value."""
+        for index in range(len(board)):
+            self.__empty[index] = board[index] == empty_value
+        for i in range(self.__height):
+            self.__update_row(i)
+        for j in range(self.__width):
+            self.__update_column(j)
+
+    def set_empty(self, i:int, j:int, empty:bool = True):
+        self.__empty[i * self.__width + j] = empty
+        self.__update_row(i)
+        self.__update_column(j)
+
+    def is_empty(self, i:int, j:int):
+        return self.__empty[i * self.__width + j] == 1
+
+    def __update_row(self, i:int):
+        empty = self.__empty
+        left = self.__left
+        right = self.__right
+        first = i * self.__width
+        run = 0
+        for index in range(first, first + self.__width):
+            run = run + 1 if empty[index] else 0
+            left[index] = run
+        run = 0
+        for index in range(first + self.__width - 1, first - 1, -1):
+            run = run + 1 if empty[index] else 0
+            right[index] = run
+
+    def __update_column(self, j:int):
+        empty = self.__empty
+        up = self.__up
+        down = self.__down
+        size = self.__width * self.__height
+        run = 0
+        for index in range(j, size, self.__width):
+            run = run + 1 if empty[index] else 0
+            up[index] = run
+        run = 0
+        for index in range(size - self.__width + j, -1, -self.__width):
+            run = run + 1 if empty[index] else 0
+            down[index] = run
+
+    def __row_clear(self, i:int, j1:int, j2:int):
+        """If every cell of the row i between the columns j1 and j2 (both excluded) is empty."""
+        low = min(j1, j2) + 1
+        high = max(j1, j2) - 1
+        return low > high or self.__right[i * self.__width + low] > high - low
+
+    def __column_clear(self, j:int, i1:int, i2:int):
+        """If every cell of the column j between the rows i1 and i2 (both excluded) is empty."""
+        low = min(i1, i2) + 1
+        high = max(i1, i2) - 1
+        return low > high or self.__down[low * self.__width + j] > high - low
+
+    def __row_reach(self, i:int, j:int):
+        """Return the first and the last column that can be reached from (i, j) moving in its row."""
+        first = j
+        last = j
+        if j > 0:
+            first -= self.__left[i * self.__width + j - 1]
+        if j < self.__width - 1:
+            last += self.__right[i * self.__width + j + 1]
+        return first, last
+
+    def __column_reach(self, i:int, j:int):
+        """Return the first and the last row that can be reached from (i, j) moving in its column."""
+        first = i
+        last = i
+        if i > 0:
+            first -= self.__up[(i - 1) * self.__width + j]
+        if i < self.__height - 1:
+            last += self.__down[(i + 1) * self.__width + j]
+        return first, last
+
+    def reach(self, i:int, j:int):
+        """Return (first_column, last_column, first_row, last_row), the cells that can be
+        reached from (i, j) moving along its row and along its column."""
+        first_column, last_column = self.__row_reach(i, j)
+        first_row, last_row = self.__column_reach(i, j)
+        return first_column, last_column, first_row, last_row
+
+    def find_corners(self, i1:int, j1:int, i2:int, j2:int):
+        """
+        Return the list of points where the path from (i1, j1) to (i2, j2) starts, turns
+        and ends, or None if there is not a path with at most two turns.
+        The path with less turns is preferred, and then the shortest one.
+        """
+        if i1 == i2 and j1 == j2:
+            return None
+
+        # Without turns -----------------------------------------------------
+        if i1 == i2:
+            if self.__row_clear(i1, j1, j2):
+                return [(i1, j1), (i2, j2)]
+        elif j1 == j2:
+            if self.__column_clear(j1, i1, i2):
+                return [(i1, j1), (i2, j2)]
+
+        # With one turn ------------------------------------------------------
+        else:
+            if self.__empty[i1 * self.__width + j2] and self.__row_clear(i1, j1, j2) and self.__column_clear(j2, i1, i2):
+                return [(i1, j1), (i1, j2), (i2, j2)]
+            if self.__empty[i2 * self.__width + j1] and self.__column_clear(j1, i1, i2) and self.__row_clear(i2, j1, j2):
+                return [(i1, j1), (i2, j1), (i2, j2)]
+
+        # With two turns -----------------------------------------------------
+        corners = None
+        length = 0
+        if i1 != i2:
+            # _   _     _
+            #  | |     |_
+            first_1, last_1 = self.__row_reach(i1, j1)
+            first_2, last_2 = self.__row_reach(i2, j2)
+            for j in range(max(first_1, first_2), min(last_1, last_2) + 1):
+                if j == j1 or j == j2 or not self.__column_clear(j, i1, i2):
+                    continue
+                current_length = abs(j1 - j) + abs(i1 - i2) + abs(j2 - j)
+                if corners is None or current_length < length:
+                    corners = [(i1, j1), (i1, j), (i2, j), (i2, j2)]
+                    length = current_length
+        if j1 != j2:
+            #  _
+            # | |  |_|
+            first_1, last_1 = self.__column_reach(i1, j1)
+            first_2, last_2 = self.__column_reach(i2, j2)
+            for i in range(max(first_1, first_2), min(last_1, last_2) + 1):
+                if i == i1 or i == i2 or not self.__row_clear(i, j1, j2):
+                    continue
+                current_length = abs(i1 - i) + abs(i2 - i) + abs(j1 - j2)
+                if corners is None or current_length < length:
+                    corners = [(i1, j1), (i, j1), (i, j2), (i2, j2)]
+                    length = current_length
+        return corners
+
+    def is_connectable(self, i1:int, j1:int, i2:int, j2:int):
+        return self.find_corners(i1, j1, i2, j2) is not None
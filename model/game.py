@@ -1,9 +1,21 @@
 
+import cProfile
+import os
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
 from model.database_controller import DatabaseController
 from model.board import Board
+from model.level_pack import LevelPack
 from model.lines import Lines
+from model.move_log import MoveLog, board_checksum, reshuffle_permutation
+from model.saved_game import SavedGame
+from model.path import Path
+from model.render_snapshot import RenderSnapshot
 from model.user_counter import UserCounter
 from model.chronometer import Chronometer
+from model.stats import Stats
 
 class Game:
 
@@ -17,6 +29,27 @@ class Game:
     ABOUT = 6
     # ------------------------------------
 
+    # The states that can follow every state
+    __TRANSITIONS = {
+        MAIN_MENU: (PLAYING, PAUSED, STATISTIC, ABOUT),
+        STATISTIC: (MAIN_MENU,),
+        ABOUT: (MAIN_MENU,),
+        PLAYING: (PAUSED, WON_GAME, GAME_OVER, MAIN_MENU),
+        PAUSED: (PLAYING, GAME_OVER, MAIN_MENU),
+        WON_GAME: (PLAYING, GAME_OVER, MAIN_MENU),
+        GAME_OVER: (PLAYING, MAIN_MENU),
+    }
+
+    # Events sent to the listeners ---------------------------
+    STATE_CHANGED = "state"
+    BOARD_CHANGED = "board"
+    SCORE_CHANGED = "score"  # The points or the level
+    SELECTION_CHANGED = "selection"
+    HINT_SHOWN = "hint_shown"
+    HINT_EXPIRED = "hint_expired"  # The advised tiles are not shown anymore
+    TIME_CHANGED = "time"  # The percent of the time that is left
+    # ---------------------------------------------------------
+
     # --------------------------------------
     POINTS_FOR_CORRECT = 10
     POINTS_FOR_INCORRECT = 5
@@ -24,34 +57,140 @@ class Game:
     POINTS_FOR_HELP = 50
     TIME_TO_SPEND_FOR_HELP = 2
     TIME_TO_SEE_HELP = 1
+    POINTS_FOR_UNDO = 5
     # --------------------------------------
 
-    def __init__(self, width:int = 10, height:int = 8, user_time:int = 150, database_path:str = "database\\players.db"):
+    def __init__(self, width:int = 10, height:int = 8, user_time:int = 150, database_path:str = "database\\players.db",
+                 board_generator:str = Board.SHUFFLE_GENERATOR, seed = None, board_reshuffle:str = Board.FULL_RESHUFFLE,
+                 tile_copies:int = 2, clock = None, level_pack_path:str = None, save_path:str = None,
+                 move_log_path:str = None):
+        """database_path can be None to play without storing the players, and clock is the
+        clock of the chronometers (see model.clock), the real time if it is None.
+        If level_pack_path is given, the boards are read from that LevelPack instead of created,
+        the level N of the player is the board N of the pack (starting again when it ends).
+        If save_path is given, the level that is being played is saved there when the game is
+        paused or quit, and it can be loaded with load_game.
+        The board of a saved game is stored as bytes, so it can not have more than EMPTY_BYTE ids.
+        If move_log_path is given, the events of the game are appended to that MoveLog, and a
+        seed is chosen if there is not one, so the game can be replayed."""
         self.__width = width
         self.__height = height
+        self.__tile_copies = tile_copies
+        self.__save_path = save_path
+        if save_path is not None and (width * height) // tile_copies > Board.EMPTY_BYTE:
+            raise Exception("The ids of the tiles do not fit in a byte, so the game can not be saved.")
 
         # To measure time-------------------
         self.__user_time = user_time
         self.__passed_time = 0
-        self.__chronometer = Chronometer()
+        self.__chronometer = Chronometer(clock)
         # ------------------------------------
 
         # To store the pair of coordinates that were clicked
         self.__clicked_coordinates = []
         #---------------------------------------------------
 
-        self.__advised_tiles_coordinates = []
-        self.__advised_tiles_chronometer = Chronometer()
+        self.__advised_tiles_coordinates = Board.ADVISED_TILE_ERROR
+        self.__advised_tiles_chronometer = Chronometer(clock)
         self.__end_time_see_help = 0
 
         self.__game_state = self.MAIN_MENU
+        self.__listeners = []
+        self.__time_percent = None  # The last percent of time that was sent with TIME_CHANGED
+        self.__render_snapshot = None  # It is taken again after every event
+
+        self.__move_log = None
+        if move_log_path is not None:
+            if seed is None:
+                seed = Random().getrandbits(31)
+            self.__move_log = MoveLog(move_log_path)
+            self.__move_log.write("session", seed=seed, width=width, height=height, copies=tile_copies,
+                                  generator=board_generator, reshuffle=board_reshuffle)
 
         self.__user_counter = UserCounter()
-        self.__board = Board(width, height)
-        self.__database = DatabaseController(database_path)
-        self.__players = self.__database.get_players_sort_by_points()
+        self.__board = Board(width, height, board_generator, seed, board_reshuffle, tile_copies)
+        self.__level_pack = None
+        if level_pack_path is not None:
+            self.__level_pack = LevelPack(level_pack_path)
+            if (self.__level_pack.width, self.__level_pack.height, self.__level_pack.copies) != (width, height, tile_copies):
+                raise Exception("The boards of the level pack are not of this size.")
+
+        # The board of the next level is created in other thread while the won level is shown,
+        # the board and the thread are only created when a level is won without a level pack
+        # Its seed is drawn from the seed of the game, seed + 1 would be the first board of other game
+        next_seed = None if seed is None else Random(seed).getrandbits(64)
+        self.__next_board_options = (width, height, board_generator, next_seed, board_reshuffle, tile_copies)
+        self.__next_board = None
+        self.__next_board_ready = None  # The Future of the creation of the next board
+        self.__board_executor = None
+        # -----------------------------------------------------------------------------------
+        self.__database = None
+        if database_path is not None:
+            self.__database = DatabaseController(database_path)
+        self.__players = self.get_all_players()
         self.__new_record = False
 
+        # Instrumentation, only when it is enabled --
+        self.__stats = None
+        self.__profile_path = None
+        self.__profile = None
+        # -------------------------------------------
+
+
+    def add_listener(self, listener):
+        """listener is called with the event (like STATE_CHANGED) every time something of the game changes."""
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.__listeners.remove(listener)
+
+    def __notify(self, event:str):
+        self.__render_snapshot = None
+        for listener in self.__listeners:
+            listener(event)
+
+    def __set_state(self, state:int):
+        if state == self.__game_state:
+            return
+        if state not in self.__TRANSITIONS[self.__game_state]:
+            raise Exception("The game can not go from the state " + str(self.__game_state) + " to " + str(state) + ".")
+        self.__game_state = state
+        self.__notify(self.STATE_CHANGED)
+
+    def update(self):
+        """
+        Follow the time while the level is played: the game is over when the time is over, the
+        advised tiles are hidden when their time to be seen is over and TIME_CHANGED is sent when
+        the percent of time left changes. It is called every frame.
+        """
+        if not self.is_playing_game():
+            return
+        time_percent = int(self.__calculate_percent())
+        if not self.is_playing_game():
+            return
+        if time_percent != self.__time_percent:
+            self.__time_percent = time_percent
+            self.__notify(self.TIME_CHANGED)
+        if self.__advised_tiles_coordinates != self.__board.ADVISED_TILE_ERROR and self.is_advised_tile_chronometer_done():
+            self.reset_advised_tile_chronometer()
+            self.reset_advised_tiles()
+
+    def get_render_snapshot(self):
+        """Return the RenderSnapshot of the game, it is only taken again when something changed."""
+        if self.__render_snapshot is None:
+            width, height = self.__board.get_board_size()
+            selected = bytearray(width * height)
+            for index in range(0, len(self.__clicked_coordinates), 2):
+                selected[self.__clicked_coordinates[index] * width + self.__clicked_coordinates[index + 1]] = 1
+            advised = bytearray(width * height)
+            if self.__advised_tiles_coordinates != self.__board.ADVISED_TILE_ERROR:
+                for i, j in self.__advised_tiles_coordinates:
+                    advised[i * width + j] = 1
+            time_percent = self.__time_percent if self.__time_percent is not None else 100
+            self.__render_snapshot = RenderSnapshot(width, height, self.__board.tile_board, selected, advised,
+                                                    time_percent, self.__user_counter.get_level(),
+                                                    self.__user_counter.get_points(), self.__game_state)
+        return self.__render_snapshot
 
     def get_id_board_element(self, i, j):
         """This return an integer representing the id and the index of the image
@@ -85,7 +224,9 @@ class Game:
         return [i, j] in self.__advised_tiles_coordinates
 
     def __reset_clicked_tiles(self):
-        self.__clicked_coordinates.clear()
+        if len(self.__clicked_coordinates) > 0:
+            self.__clicked_coordinates.clear()
+            self.__notify(self.SELECTION_CHANGED)
 
     def is_max_selected_tiles(self):
         return len(self.__clicked_coordinates) == 4
@@ -98,15 +239,40 @@ class Game:
         if self.__board.is_a_tile(i,j) and not self.is_max_selected_tiles():
             self.__clicked_coordinates.append(i)
             self.__clicked_coordinates.append(j)
-
-    def set_a_advised_tile_pair(self):
-        if self.__user_counter.are_points_bigger_than(self.POINTS_FOR_HELP):
-            self.__advised_tiles_coordinates = self.__board.get_advised_tile_pair()
-            if self.__advised_tiles_coordinates != self.__board.ADVISED_TILE_ERROR:
-                self.__user_counter.decrease_points(self.POINTS_FOR_HELP)
+            self.__notify(self.SELECTION_CHANGED)
+
+    def get_tile_board(self):
+        """Return the flat array with the ids of the tiles of the board, see Board.tile_board."""
+        return self.__board.tile_board
+
+    def iter_legal_moves(self):
+        """Yield (position_1, position_2, path) for every pair that can be played, see Board.iter_legal_moves."""
+        return self.__board.iter_legal_moves()
+
+    def get_advised_tile_pairs(self, quantity:int = 1):
+        """Return the best quantity pairs that can be played, without paying for them."""
+        return self.__board.get_advised_tile_pairs(quantity)
+
+    def set_a_advised_tile_pair(self, quantity:int = 1):
+        """Show the best quantity pairs that can be played, every shown pair costs POINTS_FOR_HELP.
+        Return the shown pairs."""
+        if self.__stats is not None:
+            self.__stats.add("hint_request")
+        advised_pairs = []
+        if self.__user_counter.are_points_bigger_than(self.POINTS_FOR_HELP * quantity):
+            advised_pairs = self.__board.get_advised_tile_pairs(quantity)
+            self.__advised_tiles_coordinates = self.__board.ADVISED_TILE_ERROR
+            if len(advised_pairs) > 0:
+                self.__advised_tiles_coordinates = [position for pair in advised_pairs for position in pair]
+                self.__user_counter.decrease_points(self.POINTS_FOR_HELP * len(advised_pairs))
                 self.__chronometer.increase_time(self.TIME_TO_SPEND_FOR_HELP)
                 self.__advised_tiles_chronometer.start()
                 self.__end_time_see_help = self.__advised_tiles_chronometer.get_current_time() + self.TIME_TO_SEE_HELP
+                self.__notify(self.HINT_SHOWN)
+                self.__notify(self.SCORE_CHANGED)
+        if self.__move_log is not None:
+            self.__move_log.write("hint", quantity=quantity, pairs=advised_pairs)
+        return advised_pairs
 
 
     def is_advised_tile_chronometer_done(self):
@@ -116,36 +282,88 @@ class Game:
         self.__advised_tiles_chronometer.reset()
 
     def reset_advised_tiles(self):
-        self.__advised_tiles_coordinates = self.__board.ADVISED_TILE_ERROR
+        if self.__advised_tiles_coordinates != self.__board.ADVISED_TILE_ERROR:
+            self.__advised_tiles_coordinates = self.__board.ADVISED_TILE_ERROR
+            self.__notify(self.HINT_EXPIRED)
 
     def play_movement(self) -> Lines:
-        to_return = Lines("", [])
+        to_return = Lines(Path())
         if self.is_max_selected_tiles():
-            positions = self.__board.play_movement(*self.__clicked_coordinates)
-
-            lines = self.__board.get_lines_by_position(positions)
-            to_return = Lines(lines, positions)
+            initial_time = time.perf_counter() if self.__stats is not None else 0
+            if self.__move_log is not None:
+                clicked_coordinates = list(self.__clicked_coordinates)
+                tile_board_before = array("h", self.__board.tile_board)  # Copied, the move changes it
+            to_return = Lines(self.__board.play_movement(*self.__clicked_coordinates))
+            if self.__stats is not None:
+                self.__stats.add("play_movement", time.perf_counter() - initial_time)
+            if self.__move_log is not None:
+                self.__log_movement(clicked_coordinates, not to_return.is_empty(), tile_board_before)
             self.__reset_clicked_tiles()
             if to_return.is_empty():
                 self.__user_counter.decrease_points(self.POINTS_FOR_INCORRECT)
             else:
                 self.__user_counter.increase_points(self.POINTS_FOR_CORRECT)
+                self.__notify(self.BOARD_CHANGED)
+            self.__notify(self.SCORE_CHANGED)
             if self.__board.is_finished():
                 self.won_level()
         return to_return
 
 
+    def __log_movement(self, clicked_coordinates:list, played:bool, tile_board_before:array):
+        self.__move_log.write("move", tiles=clicked_coordinates, played=played, time=self.get_passed_time())
+        if played:
+            permutation = reshuffle_permutation(tile_board_before, self.__board.tile_board, clicked_coordinates,
+                                                self.__board.get_board_size()[0], self.__board.EMPTY)
+            if permutation is not None:
+                self.__move_log.write("reshuffle", permutation=permutation)
+
+    def undo_movement(self):
+        """Put back the tiles of the last movement, its points are lost and POINTS_FOR_UNDO more.
+        Return True if there was a movement to undo."""
+        if not self.is_playing_game() or not self.__board.can_undo():
+            return False
+        self.__board.undo_movement()
+        if self.__move_log is not None:
+            self.__move_log.write("undo")
+        self.__reset_clicked_tiles()
+        self.reset_advised_tiles()
+        self.__user_counter.decrease_points(self.POINTS_FOR_CORRECT + self.POINTS_FOR_UNDO)
+        self.__notify(self.BOARD_CHANGED)
+        self.__notify(self.SCORE_CHANGED)
+        return True
+
+    def redo_movement(self) -> Lines:
+        """Play again the last movement that was undone, and get its points again."""
+        to_return = Lines(Path())
+        if not self.is_playing_game() or not self.__board.can_redo():
+            return to_return
+        to_return = Lines(self.__board.redo_movement())
+        if self.__move_log is not None:
+            self.__move_log.write("redo")
+        self.__reset_clicked_tiles()
+        self.reset_advised_tiles()
+        self.__user_counter.increase_points(self.POINTS_FOR_CORRECT)
+        self.__notify(self.BOARD_CHANGED)
+        self.__notify(self.SCORE_CHANGED)
+        if self.__board.is_finished():
+            self.won_level()
+        return to_return
+
     def __calculate_passed_time(self):
         self.__passed_time = self.__chronometer.get_current_time()
 
     def __calculate_percent(self):
         self.__calculate_passed_time()
         if self.__passed_time > self.__user_time:
-            self.__game_state = self.GAME_OVER
-            self.game_over()
+            self.__end_game(True)
             return 0
         return 100 - ((self.__passed_time * 100) / self.__user_time)
 
+    def get_passed_time(self):
+        """The seconds passed in the level, with the ones added by the hints."""
+        return self.__chronometer.get_current_time()
+
     def get_current_time_percent(self):
         return self.__calculate_percent()
 
@@ -172,62 +390,160 @@ class Game:
         return self.__game_state == self.ABOUT
 
     def run_game(self):
-        self.__game_state = self.PLAYING
+        self.__start_level("run")
+
+    def __start_level(self, started_by:str):
+        """started_by is the method that started the level ("run", "next" or "reset"), for the MoveLog."""
+        self.__set_state(self.PLAYING)
+        self.__time_percent = None
         self.__set_user_time(self.__user_counter.get_level())
         self.__reset_passed_time()
         self.__reset_clicked_tiles()
-        self.__board.init_board()
+        self.reset_stats()
+        self.__start_profile()
+        if self.__next_board_ready is not None:
+            self.__swap_next_board()
+        elif self.__level_pack is None:
+            self.__board.init_board()
+        else:
+            level = (self.__user_counter.get_level() - 1) % self.__level_pack.get_level_quantity()
+            self.__board.load_board(self.__level_pack.get_cells(level))
         self.__chronometer.start()
+        if self.__move_log is not None:
+            self.__move_log.write("level", level=self.__user_counter.get_level(), started_by=started_by,
+                                  board=board_checksum(self.__board.tile_board))
+        self.__notify(self.BOARD_CHANGED)
+        self.__notify(self.SCORE_CHANGED)
+
+    def __prepare_next_board(self):
+        """Start creating the board of the next level in other thread, only that thread uses it until it is swapped."""
+        if self.__level_pack is not None or self.__next_board_ready is not None:
+            return
+        if self.__next_board is None:
+            self.__next_board = Board(*self.__next_board_options)
+            self.__board_executor = ThreadPoolExecutor(max_workers=1)
+        self.__next_board_ready = self.__board_executor.submit(self.__next_board.init_board)
+
+    def __swap_next_board(self):
+        """Play with the board created in the other thread. If it is still being created it is
+        waited, because it already started, and if it could not be created a board is created here."""
+        next_board_ready = self.__next_board_ready
+        self.__next_board_ready = None
+        try:
+            next_board_ready.result()
+        except Exception:
+            self.__board.init_board()
+            return
+        self.__board, self.__next_board = self.__next_board, self.__board
+        self.__next_board.enable_stats(False)
+        self.__board.enable_stats(self.__stats is not None)
 
     def reset_game(self):
         self.__chronometer.reset()
         self.__user_counter.reset()
-        self.run_game()
+        self.__start_level("reset")
 
     def statistic(self):
-        self.__game_state = self.STATISTIC
+        self.__set_state(self.STATISTIC)
 
     def main_menu(self):
-        self.__game_state = self.MAIN_MENU
+        self.__set_state(self.MAIN_MENU)
 
     def pause_game(self):
-        self.__game_state = self.PAUSED
+        self.__calculate_passed_time()  # The time until the pause is saved
+        self.__set_state(self.PAUSED)
         self.__chronometer.pause()
-        self.__game_state = self.PAUSED
+        self.save_game()
+
+    def quit_game(self):
+        self.save_game()
+
+    def save_game(self):
+        """Save the level that is being played (or paused) in the save path, if there is one."""
+        if self.__save_path is None or not (self.is_playing_game() or self.is_paused_game()):
+            return
+        SavedGame(self.__width, self.__height, self.__tile_copies, self.__user_counter.get_level(),
+                  self.__user_counter.get_points(), self.__chronometer.get_current_time(), self.__user_time,
+                  self.__board.get_cells()).write(self.__save_path)
+
+    def load_game(self):
+        """
+        Continue the level saved in the save path, the game is left paused. The board is created
+        from the saved cells, without generating a new one. Return False if there is not a saved
+        game for a board of this size.
+        """
+        if self.__save_path is None or not os.path.exists(self.__save_path):
+            return False
+        saved_game = SavedGame.read(self.__save_path)
+        if saved_game is None or (saved_game.width, saved_game.height, saved_game.copies) != (self.__width, self.__height, self.__tile_copies):
+            return False
+        self.__user_counter.restore(saved_game.level, saved_game.points)
+        self.__user_time = saved_game.user_time
+        self.__chronometer.pause()
+        self.__chronometer.reset()
+        self.__chronometer.increase_time(saved_game.passed_time)
+        self.__passed_time = saved_game.passed_time
+        self.__reset_clicked_tiles()
+        self.reset_advised_tiles()
+        self.reset_stats()
+        self.__board.load_board(saved_game.cells)
+        self.__set_state(self.PAUSED)
+        self.__time_percent = None
+        self.__notify(self.BOARD_CHANGED)
+        self.__notify(self.SCORE_CHANGED)
+        if self.__move_log is not None:
+            self.__move_log.write("resume", level=saved_game.level)
+        return True
+
+    def __delete_saved_game(self):
+        """The level ended, so it can not be continued."""
+        if self.__save_path is not None and os.path.exists(self.__save_path):
+            os.remove(self.__save_path)
 
 
     def resume_game(self):
         if self.is_paused_game():
             self.__chronometer.start()
-            self.__game_state = self.PLAYING
-            self.reset_advised_tiles()
+            self.__set_state(self.PLAYING)
             self.reset_advised_tiles()
 
     def won_level(self):
         self.reset_advised_tile_chronometer()
         self.reset_advised_tiles()
-        self.__game_state = self.WON_GAME
+        self.__set_state(self.WON_GAME)
         self.__user_counter.won_level(self.__user_time - self.__passed_time)
+        self.__notify(self.SCORE_CHANGED)
+        self.__stop_profile()
+        self.__delete_saved_game()
+        self.__prepare_next_board()
 
 
     def next_level(self):
         self.__chronometer.reset()
         self.__user_counter.increase_level()
-        self.run_game()
+        self.__start_level("next")
         self.reset_advised_tile_chronometer()
         self.reset_advised_tiles()
-        self.__game_state = self.PLAYING
 
     def game_over(self):
-        self.__game_state = self.GAME_OVER
-        self.__new_record = self.__database.is_new_record(self.__user_counter.get_points())
+        self.__end_game(False)
+
+    def __end_game(self, time_over:bool):
+        """time_over says if the game ended because the time was over, or if the player surrendered."""
+        self.__set_state(self.GAME_OVER)
+        if self.__move_log is not None:
+            self.__move_log.write("game_over", time=self.__passed_time, time_over=time_over)
+        if self.__database is not None:
+            self.__new_record = self.__database.is_new_record(self.__user_counter.get_points())
         self.__chronometer.pause()
         self.__chronometer.reset()
         self.reset_advised_tiles()
         self.reset_advised_tile_chronometer()
+        self.__stop_profile()
+        self.__delete_saved_game()
 
     def about_menu(self):
-        self.__game_state = self.ABOUT
+        self.__set_state(self.ABOUT)
 
     def get_players_from_memory(self):
         return self.__players
@@ -236,13 +552,48 @@ class Game:
         self.__players = self.get_all_players()
 
     def get_all_players(self):
+        if self.__database is None:
+            return []
         return self.__database.get_players_sort_by_points()
 
     def insert_player(self, name:str):
+        if self.__database is None:
+            return False
         return self.__database.insert_player(name, self.__user_counter.get_level(), self.__user_counter.get_points())
 
-    def delay_thread(self, seconds):
-        self.__chronometer.delay_thread(seconds)
+    def enable_stats(self, enabled:bool = True, profile_path:str = None):
+        """
+        Start (or stop) measuring the calls and the time of the operations of the game and its
+        board, the stats are reset when a level starts. If profile_path is given, the next level
+        that starts is run with cProfile and its stats are dumped there when the level ends.
+        """
+        self.__board.enable_stats(enabled)
+        self.__stats = Stats() if enabled else None
+        self.__profile_path = profile_path if enabled else None
+
+    def get_stats(self):
+        """Return {"game": stats, "board": stats} of the current level, see Board.get_stats,
+        the game measures play_movement and hint_request (without time)."""
+        if self.__stats is None:
+            return {}
+        return {"game": self.__stats.get(), "board": self.__board.get_stats()}
+
+    def reset_stats(self):
+        if self.__stats is not None:
+            self.__stats.reset()
+            self.__board.reset_stats()
+
+    def __start_profile(self):
+        if self.__profile_path is not None and self.__profile is None:
+            self.__profile = cProfile.Profile()
+            self.__profile.enable()
+
+    def __stop_profile(self):
+        if self.__profile is not None:
+            self.__profile.disable()
+            self.__profile.dump_stats(self.__profile_path)
+            self.__profile = None
+            self.__profile_path = None
 
     def __set_user_time(self, level):
         self.__user_time = self.__user_time - ((level - 1) * 0.25)
@@ -260,6 +611,8 @@ class Game:
         return self.__new_record
 
     def reset_statistics(self):
+        if self.__database is None:
+            return
         self.__database.delete_all_players()
 
     def get_clicked_tile_positions(self):
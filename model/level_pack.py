@@ -0,0 +1,95 @@
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from model.board import Board
+from model.board_solver import BoardSolver
+
+
+class LevelPack:
+    """
+    A file with boards created before playing. It has a header and then a record of the same
+    size for every level: a byte with its grade (the movements that can be played when the level
+    starts, at most 255) and a byte for every cell with the id of its tile, row by row and
+    without the border. The file is memory-mapped, so reading a level only copies its record.
+    """
+
+    MAGIC = b"M3LP"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHHHI")  # magic, version, width, height, copies, levels
+    MAX_GRADE = 255
+
+    def __init__(self, path:str):
+        self.__file = open(path, "rb")
+        self.__memory = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.copies, self.__levels = self.HEADER.unpack_from(self.__memory, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            self.close()
+            raise Exception("The file is not a level pack.")
+        self.__record_size = 1 + self.width * self.height
+        if len(self.__memory) != self.HEADER.size + self.__levels * self.__record_size:
+            self.close()
+            raise Exception("The level pack is not complete.")
+
+    def get_level_quantity(self):
+        return self.__levels
+
+    def get_grade(self, level:int):
+        return self.__memory[self.__record_offset(level)]
+
+    def get_cells(self, level:int):
+        """Return the ids of the tiles of the level (starting from 0), see Board.load_board."""
+        offset = self.__record_offset(level) + 1
+        return self.__memory[offset : offset + self.__record_size - 1]
+
+    def __record_offset(self, level:int):
+        if level < 0 or level >= self.__levels:
+            raise IndexError("There is not a level " + str(level) + " in the pack.")
+        return self.HEADER.size + level * self.__record_size
+
+    def close(self):
+        self.__memory.close()
+        self.__file.close()
+
+
+def create_level(arguments:tuple):
+    """Return the record of a level, arguments is (width, height, copies, seed) to be sent to other processes."""
+    width, height, copies, seed = arguments
+    board = Board(width, height, Board.CONSTRUCTIVE_GENERATOR, seed, copies=copies)
+    board.init_board()
+    if board.solve()[0] == BoardSolver.UNSOLVABLE:
+        raise Exception("The board of the seed " + str(seed) + " can not be cleared.")
+    grade = min(sum(1 for move in board.iter_legal_moves()), LevelPack.MAX_GRADE)
+    return bytes([grade]) + board.get_cells()
+
+
+def create_level_pack(path:str, width:int = 10, height:int = 8, levels:int = 1000, copies:int = 2,
+                      first_seed:int = 0, workers = None):
+    """
+    Create levels boards that can be cleared, with the seeds from first_seed, in workers processes
+    (all the processors if it is None), and write them to a level pack in path.
+    """
+    if (width * height) // copies > Board.EMPTY_BYTE:
+        raise Exception("The ids of the tiles do not fit in a byte.")
+    workers = workers if workers is not None else os.cpu_count() or 1
+    arguments = [(width, height, copies, seed) for seed in range(first_seed, first_seed + levels)]
+    with open(path, "wb") as file:
+        file.write(LevelPack.HEADER.pack(LevelPack.MAGIC, LevelPack.VERSION, width, height, copies, levels))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for record in executor.map(create_level, arguments, chunksize=max(1, levels // (workers * 4))):
+                file.write(record)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a level pack with boards that can be cleared.")
+    parser.add_argument("path")
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--levels", type=int, default=1000)
+    parser.add_argument("--copies", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    arguments = parser.parse_args()
+    create_level_pack(arguments.path, arguments.width, arguments.height, arguments.levels, arguments.copies,
+                      arguments.seed, arguments.workers)
@@ -1,20 +1,16 @@
-
+from model.path import Path
 
 
 class Lines:
-    def __init__(self, lines:str, positions:list):
-        self.__lines = lines
-        self.__positions = positions
+    def __init__(self, path:Path):
+        self.__path = path
 
     def __str__(self):
-        return self.__lines + "\n" + str(self.__positions)
+        return str(self.__path)
 
     def is_empty(self):
-        return len(self.__lines) == 0
-
-
-    def get_positions(self):
-        return self.__positions
+        return self.__path.is_empty()
 
-    def get_lines(self):
-        return self.__lines
\ No newline at end of file
+    def get_path(self):
+        """Return the Path, iterating it gives ((i, j), line) for every cell."""
+        return self.__path
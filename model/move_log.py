@@ -0,0 +1,59 @@
+import json
+import zlib
+from array import array
+
+
+class MoveLog:
+    """
+    A file where the events of the games are appended as they happen, a JSON object per line
+    with its kind in "event":
+    session: a Game was created (seed, width, height, copies, generator, reshuffle).
+    level: a level started (level, started_by: "run", "next" or "reset" for the method of Game
+    that started it, board: checksum of the board).
+    resume: a saved level was loaded (level), the log can not be replayed from here.
+    move: two tiles were played (tiles: [i1, j1, i2, j2], played: if they were removed, time:
+    the seconds passed in the level).
+    reshuffle: the board was left without movements after the last move and its tiles were
+    moved (permutation, see reshuffle_permutation).
+    hint: hints were asked (quantity, pairs: the advised pairs, empty if they were not shown).
+    undo and redo: a movement was undone or redone.
+    game_over: the game ended (time, time_over: if the time was over, or else the player
+    surrendered).
+    """
+
+    def __init__(self, path:str):
+        self.__file = open(path, "a")
+
+    def write(self, event:str, **fields):
+        fields["event"] = event
+        self.__file.write(json.dumps(fields) + "\n")
+        self.__file.flush()
+
+    def close(self):
+        self.__file.close()
+
+
+def board_checksum(tile_board:array):
+    return zlib.crc32(tile_board.tobytes())
+
+
+def reshuffle_permutation(tile_board_before:array, tile_board_after:array, tiles:list, board_width:int,
+                          empty_value:int):
+    """
+    Return how the tiles were moved by the reshuffle after the move of tiles ([i1, j1, i2, j2]),
+    given the flat boards before and after the move, or None if they were not moved.
+    The permutation has, for every tile left (row by row), the index of a tile with its id
+    before the reshuffle, both counting only the tiles.
+    """
+    expected_tile_board = array("h", tile_board_before)
+    for index in range(0, 4, 2):
+        expected_tile_board[tiles[index] * board_width + tiles[index + 1]] = empty_value
+    if expected_tile_board == tile_board_after:
+        return None
+    indexes_by_id = {}
+    index = 0
+    for id in expected_tile_board:
+        if id != empty_value:
+            indexes_by_id.setdefault(id, []).append(index)
+            index += 1
+    return [indexes_by_id[id].pop() for id in tile_board_after if id != empty_value]
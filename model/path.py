@@ -0,0 +1,107 @@
+class Path:
+    """
+    The path that joins two tiles, stored only with the points where it starts, turns and ends.
+    The cells of the path and the line that is drawn in every one of them are computed when
+    the path is iterated, with the lines taken from a table.
+    """
+
+    __slots__ = ("__corners",)
+
+    UP = "u"
+    DOWN = "d"
+    RIGHT = "r"
+    LEFT = "l"
+    # ----------------------------------------------------
+    #These lines will be set in a tile where path turns.
+    TURN_FROM_LEFT_TO_DOWN = "q"
+    # _
+    #  |
+    TURN_FROM_RIGHT_TO_DOWN = "e"
+    #  _
+    # |
+    TURN_FROM_RIGHT_TO_UP = "x"
+    # |_
+    TURN_FROM_LEFT_TO_UP = "z"
+    # _|
+    #------------------------------------------------------
+
+    # ----------------------------------------
+    # This lines is for the first and last tile of a path, where the line is the half of its size.
+    UP_HALF = "v"
+    DOWN_HALF = "b"
+    LEFT_HALF = "n"
+    RIGHT_HALF = "m"
+    # ------------------------------------------------------
+
+    # The line of a cell given the step (row, column) that arrives to it and the step that
+    # leaves it, None when the path starts or ends there.
+    __LINES = {
+        (None, (-1, 0)): UP_HALF,
+        (None, (1, 0)): DOWN_HALF,
+        (None, (0, -1)): LEFT_HALF,
+        (None, (0, 1)): RIGHT_HALF,
+        ((-1, 0), None): DOWN_HALF,
+        ((1, 0), None): UP_HALF,
+        ((0, -1), None): RIGHT_HALF,
+        ((0, 1), None): LEFT_HALF,
+        ((-1, 0), (-1, 0)): UP,
+        ((1, 0), (1, 0)): DOWN,
+        ((0, -1), (0, -1)): LEFT,
+        ((0, 1), (0, 1)): RIGHT,
+        ((-1, 0), (0, 1)): TURN_FROM_RIGHT_TO_DOWN,
+        ((-1, 0), (0, -1)): TURN_FROM_LEFT_TO_DOWN,
+        ((1, 0), (0, 1)): TURN_FROM_RIGHT_TO_UP,
+        ((1, 0), (0, -1)): TURN_FROM_LEFT_TO_UP,
+        ((0, 1), (-1, 0)): TURN_FROM_LEFT_TO_UP,
+        ((0, 1), (1, 0)): TURN_FROM_LEFT_TO_DOWN,
+        ((0, -1), (-1, 0)): TURN_FROM_RIGHT_TO_UP,
+        ((0, -1), (1, 0)): TURN_FROM_RIGHT_TO_DOWN,
+    }
+
+    def __init__(self, corners:tuple = ()):
+        """corners are the positions (i, j) where the path starts, turns and ends, an empty
+        path has not corners."""
+        self.__corners = tuple(corners)
+
+    def __str__(self):
+        return str(self.__corners)
+
+    def __len__(self):
+        """The quantity of cells of the path."""
+        if len(self.__corners) == 0:
+            return 0
+        length = 1
+        for index in range(len(self.__corners) - 1):
+            length += abs(self.__corners[index][0] - self.__corners[index + 1][0])
+            length += abs(self.__corners[index][1] - self.__corners[index + 1][1])
+        return length
+
+    def __iter__(self):
+        """Yield ((i, j), line) for every cell of the path, from its start to its end."""
+        corners = self.__corners
+        if len(corners) == 0:
+            return
+        arriving_step = None
+        for index in range(len(corners) - 1):
+            i, j = corners[index]
+            to_i, to_j = corners[index + 1]
+            step = ((to_i > i) - (to_i < i), (to_j > j) - (to_j < j))
+            yield (i, j), self.__LINES[(arriving_step, step)]
+            line = self.__LINES[(step, step)]
+            i += step[0]
+            j += step[1]
+            while i != to_i or j != to_j:
+                yield (i, j), line
+                i += step[0]
+                j += step[1]
+            arriving_step = step
+        yield corners[-1], self.__LINES[(arriving_step, None)]
+
+    def is_empty(self):
+        return len(self.__corners) == 0
+
+    def get_corners(self):
+        return self.__corners
+
+    def get_turns(self):
+        return max(len(self.__corners) - 2, 0)
@@ -0,0 +1,52 @@
+from array import array
+
+
+class RenderSnapshot:
+    """
+    Everything that is needed to draw a frame of the game, taken at once so the screen does
+    not ask the game for every cell. The cells are stored row by row like Board.tile_board
+    (with its border), and nothing of a snapshot can be changed.
+    """
+
+    __slots__ = ("__width", "__height", "__tiles", "__selected", "__advised", "__time_percent", "__level",
+                 "__points", "__state")
+
+    def __init__(self, width:int, height:int, tiles:array, selected:bytearray, advised:bytearray,
+                 time_percent:int, level:int, points:int, state:int):
+        """tiles are the ids of the cells (copied), selected and advised have 1 in the cells of the
+        selected and of the advised tiles."""
+        self.__width = width
+        self.__height = height
+        self.__tiles = memoryview(array("h", tiles)).toreadonly()
+        self.__selected = bytes(selected)
+        self.__advised = bytes(advised)
+        self.__time_percent = time_percent
+        self.__level = level
+        self.__points = points
+        self.__state = state
+
+    def get_board_size(self):
+        """Return (width, height) of the board."""
+        return self.__width, self.__height
+
+    def get_tiles(self):
+        """The id of the tile of every cell, EMPTY (-1) if it is empty."""
+        return self.__tiles
+
+    def get_selected_mask(self):
+        return self.__selected
+
+    def get_advised_mask(self):
+        return self.__advised
+
+    def get_time_percent(self):
+        return self.__time_percent
+
+    def get_level(self):
+        return self.__level
+
+    def get_points(self):
+        return self.__points
+
+    def get_state(self):
+        return self.__state
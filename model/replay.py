@@ -0,0 +1,136 @@
+import argparse
+import json
+import time
+from array import array
+from model.board import Board
+from model.clock import VirtualClock
+from model.game import Game
+from model.move_log import board_checksum, reshuffle_permutation
+
+
+class Replay:
+    """
+    Play again the events of a MoveLog through Game, without screen, database or real time.
+    Every game of the log is created again with its seed, so its boards and reshuffles must be
+    the same ones, and every difference with the log is counted as a mismatch.
+    """
+
+    def __init__(self, path:str):
+        self.__path = path
+        self.__game = None
+        self.__clock = None
+        self.__permutation = None  # The reshuffle after the last replayed move, None if there was not one
+        self.__events = 0
+        self.__moves = 0
+        self.__mismatches = []
+
+    def run(self):
+        """Return a dictionary with the events and movements replayed, if the log could be
+        replayed until its end, the mismatches found and how many movements were replayed every
+        second."""
+        initial_time = time.perf_counter()
+        complete = True
+        with open(self.__path) as file:
+            for line in file:
+                event = json.loads(line)
+                self.__events += 1
+                if event["event"] == "resume":
+                    complete = False  # The saved board is not in the log
+                    break
+                if event["event"] != "reshuffle":
+                    self.__check_permutation(None)
+                getattr(self, "_Replay__replay_" + event["event"])(event)
+        self.__check_permutation(None)
+        seconds = time.perf_counter() - initial_time
+        return {
+            "events": self.__events,
+            "moves": self.__moves,
+            "complete": complete,
+            "mismatches": len(self.__mismatches),
+            "first_mismatch": self.__mismatches[0] if len(self.__mismatches) > 0 else None,
+            "seconds": seconds,
+            "moves_per_second": self.__moves / seconds if seconds > 0 else 0,
+        }
+
+    def __mismatch(self, description:str):
+        self.__mismatches.append("event " + str(self.__events) + ": " + description)
+
+    def __check_permutation(self, permutation):
+        if self.__permutation != permutation:
+            self.__mismatch("the reshuffle is not the one of the log")
+        self.__permutation = None
+
+    def __advance_to(self, seconds:float):
+        self.__clock.advance(max(seconds - self.__game.get_passed_time(), 0))
+
+    def __replay_session(self, event:dict):
+        self.__clock = VirtualClock()
+        self.__game = Game(event["width"], event["height"], database_path=None, board_generator=event["generator"],
+                           seed=event["seed"], board_reshuffle=event["reshuffle"], tile_copies=event["copies"],
+                           clock=self.__clock)
+
+    def __replay_level(self, event:dict):
+        game = self.__game
+        if event["started_by"] == "next":
+            game.next_level()
+        elif event["started_by"] == "reset":
+            game.reset_game()
+        else:
+            game.run_game()
+        if game.get_user_level() != event["level"]:
+            self.__mismatch("the level is not " + str(event["level"]))
+        elif board_checksum(game.get_tile_board()) != event["board"]:
+            self.__mismatch("the board of the level " + str(event["level"]) + " is not the one of the log")
+
+    def __replay_move(self, event:dict):
+        game = self.__game
+        tiles = event["tiles"]
+        self.__advance_to(event["time"])
+        game.add_selected_tile(tiles[0], tiles[1])
+        game.add_selected_tile(tiles[2], tiles[3])
+        tile_board_before = array("h", game.get_tile_board())  # Copied, the move changes it
+        played = not game.play_movement().is_empty()
+        self.__moves += 1
+        if played != event["played"]:
+            self.__mismatch("the tiles " + str(tiles) + " were not played like in the log")
+        elif played:
+            self.__permutation = reshuffle_permutation(tile_board_before, game.get_tile_board(), tiles,
+                                                       game.get_board_dimension()[0], Board.EMPTY)
+
+    def __replay_reshuffle(self, event:dict):
+        self.__check_permutation(event["permutation"])
+
+    def __replay_hint(self, event:dict):
+        advised_pairs = self.__game.set_a_advised_tile_pair(event["quantity"])
+        if json.loads(json.dumps(advised_pairs)) != event["pairs"]:
+            self.__mismatch("the hints are not the ones of the log")
+
+    def __replay_undo(self, event:dict):
+        if not self.__game.undo_movement():
+            self.__mismatch("there was not a movement to undo")
+
+    def __replay_redo(self, event:dict):
+        if self.__game.redo_movement().is_empty():
+            self.__mismatch("there was not a movement to redo")
+
+    def __replay_game_over(self, event:dict):
+        if not event["time_over"]:
+            self.__game.game_over()
+            return
+        self.__advance_to(event["time"])
+        self.__game.get_current_time_percent()  # The game is over if the time is over
+        if not self.__game.is_game_over():
+            self.__mismatch("the time of the level was not over")
+
+
+def replay(path:str):
+    """Replay the MoveLog in path, see Replay.run."""
+    return Replay(path).run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a log of moves without screen to check or measure the game.")
+    parser.add_argument("path")
+    arguments = parser.parse_args()
+    for key, value in replay(arguments.path).items():
+        print(key + ":", value)
@@ -0,0 +1,42 @@
+import struct
+
+
+class SavedGame:
+    """
+    The state of a game that is being played, stored in a small binary file: a header with the
+    level, the points and the time, and then a byte for every cell of the board with the id of
+    its tile, row by row and without the border (see Board.get_cells).
+    """
+
+    MAGIC = b"M3SG"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHHHIIdd")  # magic, version, width, height, copies, level, points, passed time, user time
+
+    def __init__(self, width:int, height:int, copies:int, level:int, points:int, passed_time:float,
+                 user_time:float, cells:bytes):
+        self.width = width
+        self.height = height
+        self.copies = copies
+        self.level = level
+        self.points = points
+        self.passed_time = passed_time
+        self.user_time = user_time
+        self.cells = cells
+
+    def write(self, path:str):
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.width, self.height, self.copies, self.level,
+                                        self.points, self.passed_time, self.user_time) + self.cells)
+
+    @classmethod
+    def read(cls, path:str):
+        """Return the SavedGame stored in path, or None if it is not a complete saved game."""
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < cls.HEADER.size:
+            return None
+        magic, version, width, height, copies, level, points, passed_time, user_time = cls.HEADER.unpack_from(data, 0)
+        cells = data[cls.HEADER.size:]
+        if magic != cls.MAGIC or version != cls.VERSION or len(cells) != width * height:
+            return None
+        return cls(width, height, copies, level, points, passed_time, user_time, cells)
@@ -0,0 +1,167 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from model.board import Board
+from model.clock import VirtualClock
+from model.game import Game
+
+
+class RandomBot:
+    """Play any of the pairs that can be played."""
+
+    def __init__(self, seed = None):
+        self.__random = Random(seed)
+
+    def choose_move(self, game:Game):
+        moves = list(game.iter_legal_moves())
+        if len(moves) == 0:
+            return None
+        position_1, position_2, path = moves[self.__random.randrange(len(moves))]
+        return position_1, position_2
+
+
+class GreedyBot:
+    """Play the pair with the path of fewest turns, and then the shortest one."""
+
+    def __init__(self, seed = None):
+        pass
+
+    def choose_move(self, game:Game):
+        best_move = None
+        best_rank = None
+        for position_1, position_2, path in game.iter_legal_moves():
+            rank = (path.get_turns(), len(path))
+            if best_rank is None or rank < best_rank:
+                best_move = (position_1, position_2)
+                best_rank = rank
+        return best_move
+
+
+class HintBot:
+    """Play the pair that the hints advise."""
+
+    def __init__(self, seed = None):
+        pass
+
+    def choose_move(self, game:Game):
+        advised_pairs = game.get_advised_tile_pairs(1)
+        if len(advised_pairs) == 0:
+            return None
+        position_1, position_2 = advised_pairs[0]
+        return tuple(position_1), tuple(position_2)
+
+
+BOTS = {
+    "random": RandomBot,
+    "greedy": GreedyBot,
+    "hint": HintBot,
+}
+
+
+class Simulation:
+    """
+    Play a game without screen, database or real time. A bot chooses every movement, and
+    the clock of the game moves seconds_per_move after each one.
+    If move_log_path is given, the game is written there to be replayed (see model.replay).
+    """
+
+    def __init__(self, bot, width:int = 10, height:int = 8, levels:int = 1, seed = None,
+                 seconds_per_move:float = 1.0, board_generator:str = Board.SHUFFLE_GENERATOR,
+                 board_reshuffle:str = Board.FULL_RESHUFFLE, tile_copies:int = 2, move_log_path:str = None):
+        self.__bot = bot
+        self.__levels = levels
+        self.__seconds_per_move = seconds_per_move
+        self.__clock = VirtualClock()
+        self.__game = Game(width, height, database_path=None, board_generator=board_generator, seed=seed,
+                           board_reshuffle=board_reshuffle, tile_copies=tile_copies, clock=self.__clock,
+                           move_log_path=move_log_path)
+
+    def run(self):
+        """Return a dictionary with the levels won, the points and the movements played, and
+        if the game was lost because the time was over."""
+        game = self.__game
+        won_levels = 0
+        moves = 0
+        game.run_game()
+        while True:
+            move = self.__bot.choose_move(game)
+            if move is None:
+                break
+            for i, j in move:
+                game.add_selected_tile(i, j)
+            game.play_movement()
+            moves += 1
+            self.__clock.advance(self.__seconds_per_move)
+            if game.is_won_game():
+                won_levels += 1
+                if won_levels == self.__levels:
+                    break
+                game.next_level()
+            else:
+                game.get_current_time_percent()  # The game is over if the time is over
+                if game.is_game_over():
+                    break
+        return {
+            "won_levels": won_levels,
+            "points": game.get_user_points(),
+            "moves": moves,
+            "game_over": game.is_game_over(),
+        }
+
+
+def simulate(bot_name:str, seed = None, **options):
+    """Play one game with the bot called bot_name in BOTS, the options are the ones of Simulation."""
+    return Simulation(BOTS[bot_name](seed), seed=seed, **options).run()
+
+
+def simulate_seeds(arguments:tuple):
+    """Play a game for every seed, arguments is (bot_name, seeds, options) to be sent to other processes."""
+    bot_name, seeds, options = arguments
+    return [simulate(bot_name, seed, **options) for seed in seeds]
+
+
+def run_batch(bot_name:str, games:int, workers = None, first_seed:int = 0, **options):
+    """
+    Play games with the bot called bot_name, spread in workers processes (all the processors if
+    it is None), every game with its own seed from first_seed. Return a report with the results
+    of the games and how many games and movements were played every second.
+    """
+    workers = workers if workers is not None else os.cpu_count() or 1
+    seeds = list(range(first_seed, first_seed + games))
+    chunks = [(bot_name, seeds[index::workers], options) for index in range(workers) if index < games]
+    initial_time = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(simulate_seeds, chunks):
+            results.extend(chunk_results)
+    seconds = time.perf_counter() - initial_time
+    moves = sum(result["moves"] for result in results)
+    return {
+        "bot": bot_name,
+        "games": games,
+        "workers": workers,
+        "seconds": seconds,
+        "games_per_second": games / seconds,
+        "moves_per_second": moves / seconds,
+        "won_levels": sum(result["won_levels"] for result in results),
+        "game_overs": sum(1 for result in results if result["game_over"]),
+        "moves": moves,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play games without screen to measure the game.")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="greedy")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--width", type=int, default=10)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--levels", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    report = run_batch(arguments.bot, arguments.games, arguments.workers, arguments.seed, width=arguments.width,
+                       height=arguments.height, levels=arguments.levels)
+    for key, value in report.items():
+        print(key + ":", value)
@@ -0,0 +1,18 @@
+class Stats:
+    """Calls and cumulative seconds of the measured operations, by name."""
+
+    def __init__(self):
+        self.__calls = {}
+        self.__seconds = {}
+
+    def add(self, name:str, seconds:float = 0.0, calls:int = 1):
+        self.__calls[name] = self.__calls.get(name, 0) + calls
+        self.__seconds[name] = self.__seconds.get(name, 0.0) + seconds
+
+    def get(self):
+        """Return {name: {"calls": calls, "seconds": seconds}}."""
+        return {name: {"calls": self.__calls[name], "seconds": self.__seconds[name]} for name in self.__calls}
+
+    def reset(self):
+        self.__calls.clear()
+        self.__seconds.clear()
@@ -29,6 +29,10 @@ class UserCounter:
         else:
             self.__points = 0
 
+    def restore(self, level:int, points:int):
+        self.__level = level
+        self.__points = points
+
     def reset(self):
         self.__level = 1
         self.__points = 0
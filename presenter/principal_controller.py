@@ -10,9 +10,10 @@ class PrincipalController:
     CLICKED_TILE_PATH = "data\\images\\tiles\\clicked_tile.png"
 
     DATABASE_PATH = "database\\players.db"
+    SAVE_PATH = "database\\saved_game.bin"
 
     def __init__(self):
-        self.game = Game(self.WIDTH, self.HEIGHT)
+        self.game = Game(self.WIDTH, self.HEIGHT, save_path=self.SAVE_PATH)
         self.view = None
         self.players = []
 
@@ -21,8 +22,20 @@ class PrincipalController:
         self.view.run()
 
     def play(self):
+        if not self.game.load_game():
+            self.game.run_game()
 
-        self.game.run_game()
+    def add_listener(self, listener):
+        self.game.add_listener(listener)
+
+    def update(self):
+        self.game.update()
+
+    def get_render_snapshot(self):
+        return self.game.get_render_snapshot()
+
+    def quit_game(self):
+        self.game.quit_game()
 
     def pause_game(self):
         self.game.pause_game()
@@ -54,31 +67,12 @@ class PrincipalController:
     def is_won_game(self):
         return self.game.is_won_game()
 
-    def get_current_percent(self):
-        return self.game.get_current_time_percent()
-
-    def get_id_board_element(self, i, j):
-        """This return an integer representing the id and the index of the image
-        of the tile in the position (i,j) of the board.
-        This mathod return -1 if there is not tile in that position."""
-        return self.game.get_id_board_element(i, j)
-
     def is_a_tile(self, i, j):
         return self.game.is_a_tile(i, j)
 
     def is_clicked_tile(self, i, j):
         return self.game.is_clicked_tile(i, j)
 
-    def is_advised_tile(self, i, j):
-        return self.game.is_advised_tile(i, j)
-
-    def is_help_time_over(self):
-        if self.game.is_advised_tile_chronometer_done():
-            self.game.reset_advised_tile_chronometer()
-            self.game.reset_advised_tiles()
-            return True
-        return False
-
     def set_advised_tile(self):
         self.game.set_a_advised_tile_pair()
 
@@ -94,10 +88,15 @@ class PrincipalController:
 
     def play_movement(self):
         lines = self.game.play_movement()
-        self.view.draw_line_images(lines.get_positions(), lines.get_lines())
+        self.view.draw_line_images(lines.get_path())
+
+    def undo_movement(self):
+        self.game.undo_movement()
 
-    def delay_thread(self, seconds:float):
-        self.game.delay_thread(seconds)
+    def redo_movement(self):
+        lines = self.game.redo_movement()
+        if not lines.is_empty():
+            self.view.draw_line_images(lines.get_path())
 
     def get_user_level(self):
         return self.game.get_user_level()
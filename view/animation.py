@@ -0,0 +1,52 @@
+class Animation:
+    """
+    Something that is drawn for duration milliseconds. draw is called with the part of the
+    animation that has passed, from 0 to 1, and on_end (if it is given) when it ends.
+    """
+
+    def __init__(self, duration:int, draw, on_end = None):
+        self.duration = duration
+        self.elapsed = 0
+        self.draw = draw
+        self.on_end = on_end
+
+    def get_progress(self):
+        return min(self.elapsed / self.duration, 1) if self.duration > 0 else 1
+
+    def is_done(self):
+        return self.elapsed >= self.duration
+
+
+class AnimationScheduler:
+    """
+    The animations that are being shown. They move with the milliseconds of every frame, that
+    the screen gives with tick, so nothing waits for them and the events are read while they go.
+    """
+
+    def __init__(self):
+        self.__animations = []
+
+    def add(self, animation:Animation):
+        self.__animations.append(animation)
+
+    def tick(self, milliseconds:int):
+        """Move all the animations, the ones that end are removed."""
+        ended_animations = []
+        for animation in self.__animations:
+            animation.elapsed += milliseconds
+            if animation.is_done():
+                ended_animations.append(animation)
+        for animation in ended_animations:
+            self.__animations.remove(animation)
+            if animation.on_end is not None:
+                animation.on_end()
+
+    def draw(self):
+        for animation in self.__animations:
+            animation.draw(animation.get_progress())
+
+    def clear(self):
+        self.__animations.clear()
+
+    def is_empty(self):
+        return len(self.__animations) == 0
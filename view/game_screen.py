@@ -3,6 +3,7 @@ import pygame, sys
 from pygame.locals import *
 from pathlib import Path
 import ctypes
+from view.animation import Animation, AnimationScheduler
 
 class Text:
     def __init__(self, text:str, pos:tuple, font_size:int):
@@ -190,6 +191,7 @@ class GameScreen:
     DISPLAYSURF = None
     FPS = 30
     FPSCLOCK = pygame.time.Clock()
+    LINE_ANIMATION_TIME = 250  # Milliseconds that the line of a movement and its tiles are seen
 
 
 
@@ -287,6 +289,10 @@ class GameScreen:
         self.playing_game_over_music = False
         self.writing_name = True
         self.to_play_next_level_sound = True
+        self.animations = AnimationScheduler()
+        self.to_redraw = True  # The screen is only drawn again when something changed
+        self.presenter.add_listener(self.on_game_event)
+        self.drawn_tiles = dict()  # The image index of every tile drawn in the last frame, by its position
 
         # ------BUTTONS AND INTERFACES-----------------------------------------
         #main menu
@@ -359,29 +365,54 @@ class GameScreen:
                         self.click_in_won_level_buttons(x, y)
                     elif self.presenter.is_game_over():
                         self.click_in_game_over_buttons(x, y)
+                        self.redraw()  # The players or the name that is written may change
                     elif self.presenter.is_statistic():
                         self.click_in_statistic_menu(x, y)
+                        self.redraw()  # The players may be deleted
                     elif self.presenter.is_about_menu():
                         self.click_in_about_menu(x, y)
+                elif event.type == KEYDOWN and self.presenter.is_playing_game():
+                    if event.key == K_z:
+                        self.presenter.undo_movement()
+                    elif event.key == K_y:
+                        self.presenter.redo_movement()
+                elif event.type in (ACTIVEEVENT, VIDEOEXPOSE):
+                    self.redraw()
                 elif self.presenter.is_game_over() and self.writing_name:
                     self.line_edit.write(event)
+                    self.redraw()
 
-            if self.presenter.is_paused_game():
-                self.draw_pause_menu()
-            elif self.presenter.is_main_menu():
-                self.draw_main_menu()
-            elif self.presenter.is_statistic():
-                self.draw_statistic()
-            elif self.presenter.is_game_over():
-                self.draw_game_over()
-            elif self.presenter.is_won_game():
-                self.draw_won_level(self.presenter.get_user_level(), self.presenter.get_user_points())
-            elif self.presenter.is_playing_game():
-                self.draw_level(self.presenter.get_user_level(), self.presenter.get_user_points())
-            elif self.presenter.is_about_menu():
-                self.draw_about()
-            pygame.display.flip()
-            self.FPSCLOCK.tick(self.FPS)
+            self.presenter.update()
+            if not self.presenter.is_playing_game():
+                self.animations.clear()
+            if self.to_redraw or not self.animations.is_empty():
+                self.to_redraw = False
+                self.draw()
+                pygame.display.flip()
+            self.animations.tick(self.FPSCLOCK.tick(self.FPS))
+
+    def redraw(self):
+        """Draw the screen again in the next frame."""
+        self.to_redraw = True
+
+    def on_game_event(self, event:str):
+        self.redraw()
+
+    def draw(self):
+        if self.presenter.is_paused_game():
+            self.draw_pause_menu()
+        elif self.presenter.is_main_menu():
+            self.draw_main_menu()
+        elif self.presenter.is_statistic():
+            self.draw_statistic()
+        elif self.presenter.is_game_over():
+            self.draw_game_over()
+        elif self.presenter.is_won_game():
+            self.draw_won_level(self.presenter.get_user_level(), self.presenter.get_user_points())
+        elif self.presenter.is_playing_game():
+            self.draw_level(self.presenter.get_render_snapshot())
+        elif self.presenter.is_about_menu():
+            self.draw_about()
 
 
     def __load_tile_images(self, image_path:str):
@@ -392,27 +423,35 @@ class GameScreen:
             images.append(pygame.transform.scale(pygame.image.load(current_image), (self.TILE_SIZE, self.TILE_SIZE)) )
         return images
 
-    def draw_tile(self, i:int, j:int):
+    def draw_tile(self, i:int, j:int, clicked:bool, advised:bool):
         coordinates = self.x_y_position_from_i_j(i, j)
-        if self.presenter.is_clicked_tile(i, j):
+        if clicked:
             self.DISPLAYSURF.blit(self.clicked_tile_image, coordinates)
 
-        elif self.presenter.is_advised_tile(i, j) and not self.presenter.is_help_time_over():
+        elif advised:
             self.DISPLAYSURF.blit(self.advised_tile_image, coordinates)
 
         else:
             self.DISPLAYSURF.blit(self.not_clicked_tile_image, coordinates)
 
 
-    def draw_board(self):
+    def draw_board(self, snapshot):
+        """snapshot is the RenderSnapshot of the game, every cell is read from it."""
         self.DISPLAYSURF.fill(self.BLACK)
-        for i in range(self.BOARD_HEIGHT):
-            for j in range(self.BOARD_WIDTH):
-                image_index = self.presenter.get_id_board_element(i, j)
+        self.drawn_tiles.clear()
+        tiles = snapshot.get_tiles()
+        selected = snapshot.get_selected_mask()
+        advised = snapshot.get_advised_mask()
+        width, height = snapshot.get_board_size()
+        for i in range(height):
+            for j in range(width):
+                index = i * width + j
+                image_index = tiles[index]
                 if image_index != -1:
                     coordinates = self.x_y_position_from_i_j(i, j)
-                    self.draw_tile(i, j)
+                    self.draw_tile(i, j, selected[index] == 1, advised[index] == 1)
                     self.DISPLAYSURF.blit(self.__tile_image[image_index], coordinates)
+                    self.drawn_tiles[(i, j)] = image_index
                 #-------this is for debugging-------
                 #else:
                 #    x_coordenate = self.X_MARGIN + (self.TILE_SIZE + self.GAP_SIZE) * j
@@ -455,18 +494,30 @@ class GameScreen:
             self.presenter.play_movement()
 
 
-    def draw_line_images(self, positions:list, lines:str):
-        if len(positions) == 0:
+    def draw_line_images(self, path):
+        """Show the line of the path fading out during LINE_ANIMATION_TIME, with the tiles that it
+        joins, that are not in the board anymore, until it ends."""
+        if path.is_empty():
             self.play_wrong_sound()
-
-
-        for index_line in range(len(positions)):
-            i = positions[index_line][0]
-            j = positions[index_line][1]
-            self.DISPLAYSURF.blit(self.LINE_DICTIONARY[lines[index_line]], self.x_y_position_from_i_j(i, j))
-        pygame.display.flip()
+            return
+
+        lines = [(self.x_y_position_from_i_j(i, j), self.LINE_DICTIONARY[line]) for (i, j), line in path]
+        tiles = []
+        for position in (path.get_corners()[0], path.get_corners()[-1]):
+            if position in self.drawn_tiles:
+                tiles.append((self.x_y_position_from_i_j(*position), self.__tile_image[self.drawn_tiles[position]]))
+
+        def draw(progress:float):
+            for coordinates, image in tiles:
+                self.DISPLAYSURF.blit(self.not_clicked_tile_image, coordinates)
+                self.DISPLAYSURF.blit(image, coordinates)
+            for coordinates, image in lines:
+                image.set_alpha(int(255 * (1 - progress)))
+                self.DISPLAYSURF.blit(image, coordinates)
+                image.set_alpha(None)
+
+        self.animations.add(Animation(self.LINE_ANIMATION_TIME, draw, self.redraw))
         self.play_accepted_sound()
-        self.presenter.delay_thread(0.25)
 
     def create_dictionary_of_line_images(self):
         dictionary = dict()
@@ -581,13 +632,14 @@ class GameScreen:
         self.sound_off_button.set_x_y_pos(x_pos, y_pos)
 
 
-    def draw_level(self, level:int, points:int):
+    def draw_level(self, snapshot):
         self.play_background_music()
         self.writing_name = True
-        self.draw_board()
+        self.draw_board(snapshot)
+        self.animations.draw()
         self.draw_level_buttons()
-        self.__draw_time_bar(self.presenter.get_current_percent())
-        points_text = Text("Level: " + str(level) + " Points: " + str(points), (0, 0), 16)
+        self.__draw_time_bar(snapshot.get_time_percent())
+        points_text = Text("Level: " + str(snapshot.get_level()) + " Points: " + str(snapshot.get_points()), (0, 0), 16)
         width, height = points_text.get_dimensions()
         x = (((self.X_MARGIN + (self.BOARD_WIDTH * (self.TILE_SIZE + self.GAP_SIZE))) + self.WINDOW_WIDTH) // 2) - (width // 2)
         y = self.Y_MARGIN
@@ -615,10 +667,13 @@ class GameScreen:
                 self.presenter.set_advised_tile()
             elif self.is_music_playing() and self.sound_on_button.is_clicked(x, y):
                 self.pause_background_music()
+                self.redraw()
             elif not self.is_music_playing() and self.sound_off_button.is_clicked(x, y):
                 self.unpause_background_music()
+                self.redraw()
 
     def quit(self):
+        self.presenter.quit_game()
         pygame.quit()
         sys.exit()
 